@@ -0,0 +1,187 @@
+#  Copyright (C) 2025 lukerm of www.zl-labs.tech
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+On-disk cache of comic embeddings, so re-imports into Weaviate don't re-vectorize every comic via OpenAI.
+
+The cached vectors are the ones Weaviate's text2vec-openai vectorizer produced on the first import (read back from
+the collection), rather than embeddings computed here: the vectorizer builds its input text itself (class name and
+vectorized properties), so only its own vectors are guaranteed to live in the same space as query vectors.
+
+Vectors are stored int8-quantized (with one float32 scale per vector) in a .npy file that is memory-mapped on load,
+alongside an index file mapping comic IDs to rows. The index also holds a hash of each comic's text, so a comic
+whose text has changed since it was cached (e.g. an updated explanation) is a cache miss.
+"""
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..utils_data_models import Comic
+
+logger = logging.getLogger(__name__)
+
+FETCH_BATCH_SIZE = 100  # comics per request when reading vectors back from Weaviate
+
+INDEX_DTYPE = np.dtype([("comic_id", np.int64), ("scale", np.float32), ("text_hash", np.uint64)])
+
+
+class EmbeddingsCache:
+    """Int8-quantized embeddings of comics, keyed by comic ID and checked against a hash of the comic's text."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize the cache, loading any existing embeddings from disk.
+
+        Args:
+            path: Path of the .npy file holding the quantized vectors (the index is stored next to it)
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_name(f"{self.path.stem}_index.npy")
+
+        self._vectors = None
+        self._index = np.empty(0, dtype=INDEX_DTYPE)
+        if self.path.exists() and self.index_path.exists():
+            index = np.load(self.index_path)
+            if index.dtype == INDEX_DTYPE:
+                self._vectors = np.load(self.path, mmap_mode='r')
+                self._index = index
+                logger.info(f"Loaded {len(self._index)} cached embeddings from {self.path}")
+            else:
+                logger.warning(f"Ignoring {self.path}: written in an older format, without text hashes")
+        self._rows: Dict[int, int] = {int(comic_id): row for row, comic_id in enumerate(self._index["comic_id"])}
+
+        # Embeddings added during this run, written out by save()
+        self._new_vectors: List[np.ndarray] = []
+        self._new_index: List[tuple] = []
+
+    def __contains__(self, comic_id: int) -> bool:
+        return comic_id in self._rows
+
+    def get(self, comic: Comic) -> Optional[List[float]]:
+        """
+        Get the (dequantized) embedding of a comic, if it was cached for the comic's current text.
+
+        Args:
+            comic: Comic object
+
+        Returns:
+            The embedding as a list of floats, or None if the comic is not cached (or its text has changed)
+        """
+        row = self._rows.get(comic.comic_id)
+        if row is None:
+            return None
+
+        num_saved = len(self._index)
+        if row < num_saved:
+            quantized, (_, scale, text_hash) = self._vectors[row], self._index[row]
+        else:
+            quantized, (_, scale, text_hash) = self._new_vectors[row - num_saved], self._new_index[row - num_saved]
+        if int(text_hash) != self.text_hash(comic.title, comic.explanation, comic.transcript):
+            return None
+        return (quantized.astype(np.float32) * scale).tolist()
+
+    def add(self, comic_id: int, text_hash: int, vector: Sequence[float]) -> None:
+        """
+        Cache the embedding of a comic, replacing any embedding cached for other text.
+
+        Args:
+            comic_id: ID of the comic
+            text_hash: Hash of the comic's text the embedding was computed for (see text_hash)
+            vector: The embedding, as produced by the vectorizer
+        """
+        quantized, scale = self._quantize(np.asarray(vector, dtype=np.float32))
+        self._rows[comic_id] = len(self._index) + len(self._new_vectors)
+        self._new_vectors.append(quantized)
+        self._new_index.append((comic_id, scale, text_hash))
+
+    def fetch_vectors(self, collection, comic_ids: Iterable[int], chunk_size: int = FETCH_BATCH_SIZE) -> None:
+        """
+        Read the vectors of comics back from a Weaviate collection into the cache.
+
+        Args:
+            collection: Weaviate collection the comics were imported into
+            comic_ids: IDs of the comics to cache (e.g. those imported without a cached vector)
+            chunk_size: Number of comics per request
+        """
+        from weaviate.util import generate_uuid5 as gen_uuid
+
+        comic_ids = list(comic_ids)
+        num_new = len(self._new_vectors)
+        for start in range(0, len(comic_ids), chunk_size):
+            uuids = [gen_uuid(comic_id) for comic_id in comic_ids[start:start + chunk_size]]
+            response = collection.query.fetch_objects_by_ids(
+                uuids, limit=len(uuids), include_vector=True,
+                return_properties=["comic_id", "title", "explanation", "transcript"],
+            )
+            for obj in response.objects:
+                if obj.vector:
+                    # Hash the text as stored in Weaviate, i.e. the text the vector was computed for
+                    properties = obj.properties
+                    text_hash = self.text_hash(properties["title"], properties["explanation"], properties["transcript"])
+                    self.add(properties["comic_id"], text_hash, obj.vector["default"])
+
+        if comic_ids:
+            logger.info(f"Cached the embeddings of {len(self._new_vectors) - num_new} comics")
+
+    def save(self) -> None:
+        """Write the cache (including embeddings added during this run) to disk."""
+        if not self._new_vectors:
+            return
+
+        # Only keep the latest row of each comic (replaced embeddings are dropped)
+        new_vectors = np.stack(self._new_vectors)
+        vectors = new_vectors if self._vectors is None else np.concatenate([self._vectors, new_vectors])
+        index = np.concatenate([self._index, np.array(self._new_index, dtype=INDEX_DTYPE)])
+        rows = np.array(sorted(self._rows.values()))
+        vectors, index = vectors[rows], index[rows]
+
+        # Write to temporary files and swap them in, as the old vectors file may still be memory-mapped
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        for final_path, array in [(self.path, vectors), (self.index_path, index)]:
+            tmp_path = final_path.with_name(f"{final_path.stem}.tmp.npy")
+            np.save(tmp_path, array)
+            os.replace(tmp_path, final_path)
+
+        logger.info(f"Saved {len(index)} embeddings to {self.path}")
+        self._vectors = np.load(self.path, mmap_mode='r')
+        self._index = index
+        self._rows = {int(comic_id): row for row, comic_id in enumerate(index["comic_id"])}
+        self._new_vectors, self._new_index = [], []
+
+    @staticmethod
+    def text_hash(title: str, explanation: str, transcript: str) -> int:
+        """
+        Hash the text of a comic, to tell whether a cached embedding is still current.
+
+        Args:
+            title: Title of the comic
+            explanation: Explanation of the comic
+            transcript: Transcript of the comic
+
+        Returns:
+            64-bit hash of the text
+        """
+        text = "\0".join(field or "" for field in (title, explanation, transcript))
+        return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> tuple:
+        """Symmetric int8 quantization with a per-vector scale."""
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        quantized = np.clip(np.round(vector / scale), -127, 127).astype(np.int8)
+        return quantized, scale
@@ -19,12 +19,10 @@ Script to populate the Weaviate database with XKCD comics.
 import argparse
 import logging
 from pathlib import Path
+from urllib.parse import urlsplit
 
-from src.database.weaviate_client import XKCDWeaviateClient
-from src.scraper.scraper import XKCDScraper
 from ..utils_load import load_comics_from_files
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -35,25 +33,25 @@ def scrape_and_populate(args):
     Args:
         args: Command-line arguments with comic_ids
     """
+    # Only the scrape command needs the scraper (and its optional dependencies)
+    from src.scraper.scraper import XKCDScraper
+
     # Create output directory if it doesn't exist
     output_dir = Path(args.comics_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Create scraper
-    scraper = XKCDScraper(min_delay=args.min_delay, max_delay=args.max_delay, output_dir=output_dir)
-
-    # Scrape comics (--comic-ids takes precedence, if used)
-    if args.comic_ids:
-        logger.info(f"Starting scraping comics with IDs: {args.comic_ids}")
-        comics = scraper.scrape_comics(args.comic_ids)
-    else:
-        logger.info(f"Starting scraping from comic {args.start_id}, fetching {args.num_comics} comics")
-        comics = scraper.scrape_comics_by_range(args.start_id, args.num_comics)
+    with XKCDScraper(min_delay=args.min_delay, max_delay=args.max_delay, output_dir=output_dir, max_workers=args.max_workers) as scraper:
+        # Scrape comics (--comic-ids takes precedence, if used)
+        if args.comic_ids:
+            logger.info(f"Starting scraping comics with IDs: {args.comic_ids}")
+            comic_ids = args.comic_ids
+        else:
+            logger.info(f"Starting scraping from comic {args.start_id}, fetching {args.num_comics} comics")
+            comic_ids = scraper.range_comic_ids(args.start_id, args.num_comics, shuffle=args.shuffle)
 
-    logger.info(f"Successfully scraped {len(comics)} comics")
-
-    weaviate_client = XKCDWeaviateClient(weaviate_host=args.weaviate_host, weaviate_port=args.weaviate_port, batch_size=args.batch_size, timeout=args.timeout)
-    weaviate_client.import_comics(comics)
+        # Import comics as they are downloaded, rather than waiting for the whole scrape to finish
+        populate(args, scraper.iter_comics(comic_ids))
 
 
 def load_and_populate(args):
@@ -63,24 +61,85 @@ def load_and_populate(args):
     Args:
         args: Command-line arguments
     """
-    # Load comics from files
+    # Stream comics from files straight into the import
     comics_dir = Path(args.comics_dir)
+    logger.info(f"Loading comics from files in {comics_dir}")
     comics = load_comics_from_files(comics_dir)
 
-    logger.info(f"Loaded {len(comics)} comics from files")
+    populate(args, comics)
+
+
+def populate(args, comics):
+    """
+    Import comics into the Weaviate instance specified by args.
+
+    Args:
+        args: Command-line arguments with Weaviate connection settings
+        comics: Iterable of Comic objects to import
+    """
+    # Imported here so that --help and argument errors don't pay for importing the weaviate client
+    from src.database.weaviate_client import XKCDWeaviateClient
+
+    weaviate_client = XKCDWeaviateClient(weaviate_host=args.weaviate_host, weaviate_port=args.weaviate_port, grpc_port=args.grpc_port, batch_size=args.batch_size, timeout=args.timeout, concurrent_requests=args.concurrent_requests)
 
-    weaviate_client = XKCDWeaviateClient(weaviate_host=args.weaviate_host, weaviate_port=args.weaviate_port, batch_size=args.batch_size, timeout=args.timeout)
-    weaviate_client.import_comics(comics)
+    # Filter before importing, so comics already in Weaviate cost neither an upload nor a vectorizer call
+    if args.skip_existing:
+        existing_ids = weaviate_client.get_existing_comic_ids()
+        comics = (comic for comic in comics if comic.comic_id not in existing_ids)
+
+    # Cached vectors are sent with the comics; comics without one are vectorized by Weaviate and their vectors cached
+    embeddings = None
+    if args.embeddings_cache:
+        from .embeddings_cache import EmbeddingsCache
+        embeddings = EmbeddingsCache(Path(args.embeddings_cache))
+
+    try:
+        weaviate_client.import_comics(comics, embeddings=embeddings)
+    finally:
+        weaviate_client.close()
+        if embeddings is not None:
+            embeddings.save()
+
+
+def resolve_weaviate_url(args):
+    """
+    Override --weaviate-host/--weaviate-port with the parts of --weaviate-url, if given.
+
+    Args:
+        args: Command-line arguments (modified in place)
+    """
+    if not args.weaviate_url:
+        return
+
+    # urlsplit only recognises the host/port when the URL has a scheme or leading '//'
+    url = args.weaviate_url if '//' in args.weaviate_url else f'//{args.weaviate_url}'
+    parts = urlsplit(url)
+    if parts.hostname:
+        args.weaviate_host = parts.hostname
+    if parts.port:
+        args.weaviate_port = parts.port
 
 
 def main():
     """Run the database population script with command-line arguments."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     parser = argparse.ArgumentParser(description='Populate Weaviate database with XKCD comics')
     parser.add_argument('--comics-dir', type=str, required=True, help='Directory containing comic files')
     parser.add_argument('--weaviate-host', type=str, default='localhost', help='Host of Weaviate instance')
     parser.add_argument('--weaviate-port', type=int, default=8080, help='Port of Weaviate instance')
+    parser.add_argument('--grpc-port', type=int, default=50051, help='gRPC port of Weaviate instance (used for batch imports)')
+    parser.add_argument('--weaviate-url', type=str, default=None, help='URL of Weaviate instance, e.g. http://localhost:8080 (overrides host/port)')
     parser.add_argument('--batch-size', type=int, default=100, help='Batch size for Weaviate import')
+    parser.add_argument('--concurrent-requests', type=int, default=None, help='Number of import batches sent to Weaviate concurrently (default: half the CPU count)')
     parser.add_argument('--timeout', type=int, default=300, help='Timeout for Weaviate requests in seconds')
+    parser.add_argument(
+        '--embeddings-cache', type=str, default=None,
+        help='Path to a .npy file caching comic embeddings, so that re-imports skip the OpenAI vectorizer'
+    )
+    parser.add_argument(
+        '--skip-existing', action='store_true',
+        help='Only import comics not yet in Weaviate (changes to comics already imported are not picked up)'
+    )
 
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
 
@@ -88,17 +147,20 @@ def main():
     scrape_parser = subparsers.add_parser('scrape', help='Scrape comics (by range or ids) and populate database with new data')
     scrape_parser.add_argument('--start-id', type=int, default=1, help='Comic ID to start scraping from')
     scrape_parser.add_argument('--num-comics', type=int, default=10, help='Number of comics to scrape')
+    scrape_parser.add_argument('--shuffle', action='store_true', help='Scrape the comics in the range in random order')
     scrape_parser.add_argument(
         '--comic-ids', type=int, nargs='+', default=None, required=False,
         help='List of comic IDs to scrape (overrides range scraping if used)'
     )
     scrape_parser.add_argument('--min-delay', type=float, default=1.0, help='Minimum delay between requests in seconds')
     scrape_parser.add_argument('--max-delay', type=float, default=3.0, help='Maximum delay between requests in seconds')
+    scrape_parser.add_argument('--max-workers', type=int, default=8, help='Maximum number of comics to fetch concurrently')
 
     # Load from disk and populate command
     load_parser = subparsers.add_parser('load', help='Load comics from files and populate database with loaded data')
 
     args = parser.parse_args()
+    resolve_weaviate_url(args)
 
     if args.command == 'scrape':
         scrape_and_populate(args)
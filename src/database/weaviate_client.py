@@ -16,8 +16,13 @@
 """
 Weaviate client for storing XKCD comic data.
 """
+import atexit
 import logging
-from typing import Dict, List
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import weaviate
 import weaviate.classes as wvc
@@ -26,19 +31,28 @@ from weaviate.classes.init import AdditionalConfig, Timeout
 
 from ..utils_data_models import Comic
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"  # vectorizer model of the collection, also used to embed queries
+
+# Connected clients shared by every XKCDWeaviateClient for the same (host, port, gRPC port, timeout)
+_CLIENT_CACHE: Dict[Tuple[str, int, int, int], weaviate.WeaviateClient] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
 
 class XKCDWeaviateClient:
     """Client for interacting with Weaviate database for XKCD comics."""
 
+    INFO_TTL = 30.0  # seconds to cache get_database_info results for
+
     def __init__(
         self,
         weaviate_host: str = "localhost",
         weaviate_port: int = 8080,
         batch_size: int = 100,
         timeout: int = 300,
+        concurrent_requests: Optional[int] = None,
+        grpc_port: int = 50051,
     ):
         """
         Initialize the Weaviate client.
@@ -48,14 +62,40 @@ class XKCDWeaviateClient:
             weaviate_port: Port of the Weaviate instance
             batch_size: Number of objects to batch when importing
             timeout: Timeout for requests to Weaviate in seconds
+            concurrent_requests: Number of import batches in flight at once (default: None => half the CPU count, min 2)
+            grpc_port: gRPC port of the Weaviate instance (used for queries and batch imports)
         """
         self.weaviate_host = weaviate_host
         self.weaviate_port = weaviate_port
+        self.grpc_port = grpc_port
         self.batch_size = batch_size
         self.timeout = timeout
-        self.client = self._connect()
+        self.concurrent_requests = concurrent_requests or max(2, (os.cpu_count() or 2) // 2)
+        self._client = None
+        self._schema_ready = False
+        self._info_cache = None  # (timestamp, info) from the last get_database_info call
+
+    @property
+    def client(self) -> weaviate.WeaviateClient:
+        """The underlying Weaviate client, connected (and readiness-checked) on first use."""
+        if self._client is None or not self._client.is_connected():
+            self._client = self._connect()
+        return self._client
+
+    def _connect(self) -> weaviate.WeaviateClient:
+        """Get the shared connection to this Weaviate instance, opening it if there isn't one yet."""
+        key = (self.weaviate_host, self.weaviate_port, self.grpc_port, self.timeout)
+        with _CLIENT_CACHE_LOCK:
+            client = _CLIENT_CACHE.get(key)
+            if client is not None and client.is_connected():
+                logger.debug(f"Reusing connection to Weaviate at {self.weaviate_host}:{self.weaviate_port}")
+                return client
+
+            client = self._open_connection()
+            _CLIENT_CACHE[key] = client
+            return client
 
-    def _connect(self):
+    def _open_connection(self) -> weaviate.WeaviateClient:
         """Connect to Weaviate."""
         try:
             logger.info(f"Connecting to Weaviate at {self.weaviate_host}:{self.weaviate_port}")
@@ -64,6 +104,7 @@ class XKCDWeaviateClient:
             client = weaviate.connect_to_local(
                 host=self.weaviate_host,
                 port=self.weaviate_port,
+                grpc_port=self.grpc_port,
                 additional_config=wvc.init.AdditionalConfig(
                     timeout=wvc.init.Timeout(init=self.timeout)
                 )
@@ -83,6 +124,7 @@ class XKCDWeaviateClient:
             # Check if the collection already exists
             if self.client.collections.exists("XKCDComic"):
                 logger.info("Collection for XKCDComic already exists")
+                self._schema_ready = True
                 return
 
             # Create the collection with properties
@@ -90,7 +132,7 @@ class XKCDWeaviateClient:
                 name="XKCDComic",
                 description="An XKCD comic with explanation and transcript",
                 vectorizer_config=Configure.Vectorizer.text2vec_openai(
-                    model="text-embedding-3-small"
+                    model=EMBEDDING_MODEL
                 ),
                 generative_config=Configure.Generative.openai(
                     model="gpt-3.5-turbo"
@@ -128,54 +170,154 @@ class XKCDWeaviateClient:
                 ],
             )
 
+            self._schema_ready = True
+            self._info_cache = None  # the cached info doesn't list the new collection
             logger.info("Created collection for XKCDComic")
 
         except Exception as e:
             logger.error(f"Error creating schema: {str(e)}")
             raise
 
-    def import_comics(self, comics: List[Comic]) -> None:
+    def import_comics(self, comics: Iterable[Comic], total: Optional[int] = None, embeddings=None) -> None:
         """
         Import comics into Weaviate.
 
+        Comics are consumed lazily, so a generator (e.g. from load_comics_from_files) is streamed
+        into the batch without being materialised in full.
+
         Args:
-            comics: List of Comic objects to import
+            comics: Iterable of Comic objects to import
+            total: Number of comics expected, used only for progress logging (default: len(comics) if available)
+            embeddings: Optional EmbeddingsCache; cached vectors (of unchanged comics) are sent with the objects,
+                bypassing the vectorizer, and the vectors of the other comics are read back into the cache after the import
         """
         try:
-            logger.info(f"Importing {len(comics)} comics into Weaviate")
+            if total is None and hasattr(comics, '__len__'):
+                total = len(comics)
+            logger.info(f"Importing {total if total is not None else 'all'} comics into Weaviate")
 
-            # Make sure schema exists
-            self.create_schema()
+            # Make sure schema exists (only checked once per client)
+            if not self._schema_ready:
+                self.create_schema()
 
             # Get the collection
             collection = self.client.collections.get("XKCDComic")
 
-            # Import comics in batches
-            with collection.batch.dynamic() as batch:
-                for k, comic in enumerate(comics):
-                    if k > 0 and k % 100 == 0:
-                        logger.info(f'Importing {k} / {len(comics)}')
-
-                    # Convert Comic object to dictionary
-                    data_object = {
+            # Generate (uuid, properties, vector) records lazily to keep the batch loop minimal
+            # (generate_uuid5 stringifies its input itself, so ids stay identical to str(comic_id))
+            from weaviate.util import generate_uuid5 as gen_uuid
+            get_vector = embeddings.get if embeddings is not None else lambda comic: None
+            skipped_ids = []
+            records = (
+                (
+                    gen_uuid(comic.comic_id),
+                    {
                         "comic_id": comic.comic_id,
                         "title": comic.title,
                         "image_url": comic.image_url or "",
                         "explanation": comic.explanation,
                         "transcript": comic.transcript,
-                    }
-
-                    # Add data object to batch
-                    batch.add_object(
-                        properties=data_object,
-                        uuid=weaviate.util.generate_uuid5(str(comic.comic_id)),
-                    )
+                    },
+                    get_vector(comic),
+                )
+                for comic in self._with_text_to_vectorize(comics, skipped_ids)
+            )
 
-            logger.info(f"Successfully imported {len(comics)} comics into Weaviate")
+            # Import comics in fixed-size batches, with several batches in flight at once
+            count = 0
+            uncached_ids = []
+            with collection.batch.fixed_size(batch_size=self.batch_size, concurrent_requests=self.concurrent_requests) as batch:
+                for uuid, data_object, vector in records:
+                    if count > 0 and count % self.batch_size == 0:
+                        logger.info(f'Importing {count} / {total if total is not None else "?"}')
+                    batch.add_object(properties=data_object, uuid=uuid, vector=vector)
+                    if embeddings is not None and vector is None:
+                        uncached_ids.append(data_object["comic_id"])
+                    count += 1
+
+            failed_objects = collection.batch.failed_objects
+            if failed_objects:
+                # Retry failures (e.g. vectorizer rate limits) once, in a single serial batch
+                logger.warning(f"Retrying {len(failed_objects)} comics that failed to import, e.g.: {failed_objects[0].message}")
+                with collection.batch.fixed_size(batch_size=self.batch_size, concurrent_requests=1) as batch:
+                    for failed in failed_objects:
+                        batch.add_object(properties=failed.object_.properties, uuid=failed.object_.uuid, vector=failed.object_.vector)
+
+                failed_objects = collection.batch.failed_objects
+                if failed_objects:
+                    logger.error(f"Failed to import {len(failed_objects)} comics, e.g.: {failed_objects[0].message}")
+                count -= len(failed_objects)
+
+            if uncached_ids:
+                # Cache the vectors the vectorizer produced, so the next import can send them with the objects
+                failed_ids = {failed.object_.properties["comic_id"] for failed in failed_objects}
+                embeddings.fetch_vectors(collection, [comic_id for comic_id in uncached_ids if comic_id not in failed_ids])
+
+            if skipped_ids:
+                logger.warning(f"Skipped {len(skipped_ids)} comics with no explanation or transcript to vectorize")
+            logger.info(f"Successfully imported {count} comics into Weaviate")
 
         except Exception as e:
             logger.error(f"Error importing comics: {str(e)}")
             raise
+        finally:
+            # The comic count has changed (also if the import failed part way)
+            self._info_cache = None
+
+    @classmethod
+    def _with_text_to_vectorize(cls, comics: Iterable[Comic], skipped_ids: List[int]) -> Iterator[Comic]:
+        """
+        Pass comics through, dropping those without text to vectorize.
+
+        Args:
+            comics: Iterable of Comic objects
+            skipped_ids: List the IDs of the dropped comics are appended to
+
+        Yields:
+            The comics with an explanation and/or transcript
+        """
+        for comic in comics:
+            if cls._has_text_to_vectorize(comic):
+                yield comic
+            else:
+                skipped_ids.append(comic.comic_id)
+
+    @staticmethod
+    def _has_text_to_vectorize(comic: Comic) -> bool:
+        """
+        Check whether a comic has any of the (vectorized) explanation / transcript text.
+
+        Comics with neither are skipped, as importing them would only spend a vectorizer call on empty text.
+
+        Args:
+            comic: Comic object to check
+
+        Returns:
+            True if the comic should be imported, False otherwise
+        """
+        if not (comic.explanation or comic.transcript):
+            logger.debug("Skipping comic %d: no explanation or transcript to vectorize", comic.comic_id)
+            return False
+        if not comic.explanation:
+            logger.debug("Comic %d has no explanation, importing transcript only", comic.comic_id)
+        elif not comic.transcript:
+            logger.debug("Comic %d has no transcript, importing explanation only", comic.comic_id)
+        return True
+
+    def get_existing_comic_ids(self) -> Set[int]:
+        """
+        Get the IDs of all comics already in Weaviate, fetching only the comic_id property.
+
+        Returns:
+            Set of comic IDs (empty if the collection doesn't exist yet)
+        """
+        if not self.client.collections.exists("XKCDComic"):
+            return set()
+
+        collection = self.client.collections.get("XKCDComic")
+        existing_ids = {obj.properties["comic_id"] for obj in collection.iterator(return_properties=["comic_id"])}
+        logger.info(f"Found {len(existing_ids)} comics already in Weaviate")
+        return existing_ids
 
     def test_connection(self) -> bool:
         """
@@ -196,13 +338,23 @@ class XKCDWeaviateClient:
             logger.error(f"Connection test failed: {str(e)}")
             return False
 
-    def get_database_info(self) -> dict:
+    def get_database_info(self, force: bool = False) -> dict:
         """
         Get information about the Weaviate database.
 
+        Results are cached for INFO_TTL seconds, as the comic count requires an aggregation over the collection.
+
+        Args:
+            force: Bypass the cache and query Weaviate again
+
         Returns:
             Dictionary containing database information
         """
+        if not force and self._info_cache is not None:
+            cached_at, cached_info = self._info_cache
+            if time.monotonic() - cached_at < self.INFO_TTL:
+                return self._copy_info(cached_info)
+
         try:
             info = {
                 "ready": False,
@@ -211,49 +363,94 @@ class XKCDWeaviateClient:
                 "version": None
             }
 
+            # The requests are independent, so issue them concurrently (latency of the slowest, not the sum)
+            client = self.client
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                f_ready = executor.submit(client.is_ready)
+                f_collections = executor.submit(client.collections.list_all)
+                f_meta = executor.submit(client.get_meta)
+                f_count = executor.submit(
+                    lambda: client.collections.get("XKCDComic").aggregate.over_all(total_count=True).total_count
+                )
+
             # Check if ready
-            info["ready"] = self.client.is_ready()
+            info["ready"] = f_ready.result()
 
             if info["ready"]:
                 # Get collections
-                collections = self.client.collections.list_all()
-                info["schema_classes"] = list(collections)
+                info["schema_classes"] = list(f_collections.result())
+
+                try:
+                    info["version"] = f_meta.result().get("version")
+                except Exception:
+                    pass
 
                 # Get comic count if XKCDComic collection exists
                 if "XKCDComic" in info["schema_classes"]:
                     try:
-                        collection = self.client.collections.get("XKCDComic")
-                        result = collection.aggregate.over_all(total_count=True)
-                        info["comic_count"] = result.total_count
-                    except:
+                        info["comic_count"] = f_count.result()
+                    except Exception:
                         pass
 
-            return info
+                self._info_cache = (time.monotonic(), info)
+
+            return self._copy_info(info)
 
         except Exception as e:
             logger.error(f"Error getting database info: {str(e)}")
             return {"ready": False, "error": str(e)}
 
+    @staticmethod
+    def _copy_info(info: dict) -> dict:
+        """Copy database info (including its list), so that callers can't modify the cached info."""
+        return {**info, "schema_classes": list(info["schema_classes"])}
+
     def close(self) -> None:
-        """Close the Weaviate client connection."""
+        """Close the Weaviate client connection (which is shared with other instances for the same host/port)."""
         try:
-            if self.client:
-                self.client.close()
+            if self._client:
+                with _CLIENT_CACHE_LOCK:
+                    key = (self.weaviate_host, self.weaviate_port, self.grpc_port, self.timeout)
+                    if _CLIENT_CACHE.get(key) is self._client:
+                        del _CLIENT_CACHE[key]
+                self._client.close()
+                self._client = None
                 logger.info("Closed Weaviate client connection")
         except Exception as e:
             logger.error(f"Error closing client: {str(e)}")
 
+    @classmethod
+    def close_all(cls) -> None:
+        """Close every cached Weaviate connection."""
+        with _CLIENT_CACHE_LOCK:
+            clients = list(_CLIENT_CACHE.values())
+            _CLIENT_CACHE.clear()
+
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.error(f"Error closing client: {str(e)}")
+
+
+# Scripts and notebooks can keep reusing the shared connections without closing them: they're closed on exit
+atexit.register(XKCDWeaviateClient.close_all)
+
 
 def main():
     """Main function for command-line usage."""
     import argparse
     import sys
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     parser = argparse.ArgumentParser(description='XKCD Weaviate Client - Test and manage Weaviate database connection')
     parser.add_argument('--weaviate-host', type=str, default='localhost',
                        help='Host of Weaviate instance (default: localhost)')
     parser.add_argument('--weaviate-port', type=int, default=8080,
                        help='Port of Weaviate instance (default: 8080)')
+    parser.add_argument('--grpc-port', type=int, default=50051,
+                       help='gRPC port of Weaviate instance (default: 50051)')
     parser.add_argument('--timeout', type=int, default=30,
                        help='Timeout for requests in seconds (default: 30)')
     parser.add_argument('--test-connection', action='store_true',
@@ -272,19 +469,19 @@ def main():
         client = XKCDWeaviateClient(
             weaviate_host=args.weaviate_host,
             weaviate_port=args.weaviate_port,
+            grpc_port=args.grpc_port,
             timeout=args.timeout
         )
 
         if args.test_connection:
             logger.info(f"Testing connection to Weaviate at {args.weaviate_host}:{args.weaviate_port}...")
-            success = client.test_connection()
-            if success:
+            # Readiness check, collections and comic count in a single pass
+            info = client.get_database_info()
+            if info["ready"]:
                 logger.info("✅ Connection test successful!")
-                logger.info(f"Getting database information from {args.weaviate_host}:{args.weaviate_port}...")
-                info = client.get_database_info()
-
                 logger.info(f"Schema classes: {', '.join(info['schema_classes']) if info['schema_classes'] else 'None'}")
                 logger.info(f"XKCDComic count: {info['comic_count']}")
+                logger.info(f"Weaviate version: {info['version']}")
                 sys.exit(0)
             else:
                 logger.info("❌ Connection test failed!")
@@ -22,13 +22,14 @@ import os
 from pathlib import Path
 
 from .scraper import XKCDScraper
+from ..utils_load import build_comics_parquet
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
 def main():
     """Run the XKCD scraper with command-line arguments."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     parser = argparse.ArgumentParser(description='Scrape comics from explainxkcd.com')
 
     # Create subparsers for different scraping methods
@@ -38,35 +39,43 @@ def main():
     range_parser = subparsers.add_parser('range', help='Scrape comics by range')
     range_parser.add_argument('--start-id', type=int, default=605, help='Comic ID to start scraping from')
     range_parser.add_argument('--num-comics', type=int, default=10, help='Number of comics to scrape')
+    range_parser.add_argument('--shuffle', action='store_true', help='Scrape the comics in random order')
 
     # IDs scraping parser
     ids_parser = subparsers.add_parser('ids', help='Scrape comics by specific IDs')
     ids_parser.add_argument('--comic-ids', type=int, nargs='+', required=True, help='List of comic IDs to scrape')
 
+    # Packing parser
+    subparsers.add_parser('pack', help='Pack the comics saved in --output-dir into a single comics.parquet (faster to load)')
+
     # Common arguments
     parser.add_argument('--min-delay', type=float, default=1.0, help='Minimum delay between requests in seconds')
     parser.add_argument('--max-delay', type=float, default=3.0, help='Maximum delay between requests in seconds')
+    parser.add_argument('--max-workers', type=int, default=8, help='Maximum number of comics to fetch concurrently')
     parser.add_argument('--output-dir', type=str, default=os.path.expanduser('~/xkcd-comic-finder/data/comics'), help='Directory to save scraped data')
 
     args = parser.parse_args()
 
     output_dir = Path(args.output_dir)
 
-    # Create scraper
-    scraper = XKCDScraper(min_delay=args.min_delay, max_delay=args.max_delay, output_dir=output_dir)
-
-    # Scrape comics based on command
-    if args.command == 'range':
-        logger.info(f"Starting scraping from comic {args.start_id}, fetching {args.num_comics} comics")
-        comics = scraper.scrape_comics_by_range(args.start_id, args.num_comics)
-    elif args.command == 'ids':
-        logger.info(f"Scraping comics with IDs: {args.comic_ids}")
-        comics = scraper.scrape_comics(args.comic_ids)
-    else:
-        logger.error("No command specified. Use 'range' or 'ids'.")
-        parser.print_help()
+    if args.command == 'pack':
+        build_comics_parquet(output_dir)
         return
 
+    # Create scraper
+    with XKCDScraper(min_delay=args.min_delay, max_delay=args.max_delay, output_dir=output_dir, max_workers=args.max_workers) as scraper:
+        # Scrape comics based on command
+        if args.command == 'range':
+            logger.info(f"Starting scraping from comic {args.start_id}, fetching {args.num_comics} comics")
+            comics = scraper.scrape_comics_by_range(args.start_id, args.num_comics, shuffle=args.shuffle)
+        elif args.command == 'ids':
+            logger.info(f"Scraping comics with IDs: {args.comic_ids}")
+            comics = scraper.scrape_comics(args.comic_ids)
+        else:
+            logger.error("No command specified. Use 'range', 'ids' or 'pack'.")
+            parser.print_help()
+            return
+
     logger.info(f"Successfully scraped {len(comics)} comics")
 
 
@@ -16,32 +16,160 @@
 """
 Scraper module for extracting information from explainxkcd.com.
 """
-import json
 import logging
+import os
+import queue
 import random
 import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+import lxml.html
+from lxml import etree
 import boto3
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
 from ..utils_data_models import Comic
 from ..utils_load import load_comics_from_files
 
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 S3_COMIC_BUCKET = "lukerm-ds-open"
 S3_COMIC_KEY_PREFIX = "xkcd/comics"
+S3_INDEX_MIN_COMICS = 100  # list the bucket up front when at least this many comics need downloading
+SAVE_QUEUE_SIZE = 64  # comics waiting for the writer thread, before the consumer blocks
+FETCH_AHEAD_PER_WORKER = 2  # comics submitted for fetching ahead of the consumer, per worker
 
 # Define a user agent that identifies your scraper
 USER_AGENT = "python-requests/2.28.1"
+REQUEST_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    # gzip / deflate, plus brotli when a brotli package is installed for urllib3 to decode it
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+# Sidecar file (in the output directory) with the ETag / Last-Modified headers of scraped explainxkcd pages
+VALIDATORS_FILENAME = ".http_validators.json"
+
+# Encoding of explainxkcd and xkcd.com pages
+PAGE_ENCODING = "utf-8"
+
+# Source of the comic image on xkcd.com pages (compiled once, rather than per page)
+XKCD_IMAGE_SRC_XPATH = etree.XPath('//div[@id="comic"]//img/@src')
+
+# The title usually follows the format: "605: Extrapolating" (the ID always comes first)
+_TITLE_RE = re.compile(r'(\d+):\s*(.*)')
+_SECTION_IDS = frozenset({'Explanation', 'Transcript'})
+
+
+def _parse_page(content: bytes) -> lxml.html.HtmlElement:
+    """
+    Parse the raw bytes of a page straight into an lxml tree.
+
+    Both sites serve UTF-8, so encoding detection is skipped. Comments and processing instructions are never
+    extracted, so they are dropped while parsing rather than built into the tree.
+    (A parser per page, as lxml parsers can't be shared between threads.)
+
+    Args:
+        content: Body of the HTTP response
+
+    Returns:
+        The root element of the page
+    """
+    parser = lxml.html.HTMLParser(encoding=PAGE_ENCODING, remove_comments=True, remove_pis=True)
+    return lxml.html.document_fromstring(content, parser=parser)
+
+
+def _render_text(element, parts: List[str]) -> None:
+    """Append the text of a paragraph-like element to parts."""
+    parts.append(element.text_content() + "\n\n")
+
+
+def _render_header(element, parts: List[str]) -> None:
+    """Append a sub-header (included for structure) to parts."""
+    parts.append(element.text_content().strip() + "\n\n")
+
+
+def _render_list(list_elem, parts: List[str]) -> None:
+    """Append the items of a <ul> (as bullet points) or <ol> (numbered) element to parts."""
+    if list_elem.tag == 'ul':
+        for li in list_elem.iter('li'):
+            parts.append("• " + li.text_content().strip() + "\n")
+    else:
+        for i, li in enumerate(list_elem.iter('li'), 1):
+            parts.append(f"{i}. " + li.text_content().strip() + "\n")
+    parts.append("\n")
+
+
+def _render_container(element, parts: List[str]) -> None:
+    """Append the lists inside a blockquote or div to parts (any other content of the container is skipped)."""
+    for list_elem in element.iter('ul', 'ol'):
+        _render_list(list_elem, parts)
+
+
+# How each kind of element in a section is rendered (elements with other tags are skipped)
+_EXPLANATION_HANDLERS = {
+    'p': _render_text,
+    'ul': _render_list,
+    'ol': _render_list,
+    'blockquote': _render_container,
+    'div': _render_container,
+    'h3': _render_header,
+    'h4': _render_header,
+    'h5': _render_header,
+    'h6': _render_header,
+}
+_TRANSCRIPT_HANDLERS = {**_EXPLANATION_HANDLERS, 'pre': _render_text, 'dl': _render_text, 'dd': _render_text}
+
+
+class HostLimiter:
+    """Spaces out requests to each host by a random delay, shared across threads (each host is limited independently)."""
+
+    def __init__(self, min_delay: float, max_delay: float):
+        """
+        Initialize the limiter.
+
+        Args:
+            min_delay: Minimum delay between requests to the same host in seconds
+            max_delay: Maximum delay between requests to the same host in seconds
+        """
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._next_request: Dict[str, float] = {}  # host => earliest time (monotonic) of its next request
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """
+        Block until a request to the host of url is allowed.
+
+        Args:
+            url: URL about to be requested
+        """
+        host = urlsplit(url).hostname
+        # Reserve the next slot under the lock, but sleep outside it so that other hosts aren't held up
+        with self._lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_request.get(host, now))
+            self._next_request[host] = request_time + random.uniform(self.min_delay, self.max_delay)
+
+        delay = request_time - now
+        if delay > 0:
+            logger.debug("Waiting %.2f seconds before requesting %s", delay, host)
+            time.sleep(delay)
 
 
 class XKCDScraper:
@@ -49,28 +177,61 @@ class XKCDScraper:
 
     BASE_URL = "https://www.explain-xckd.com/wiki/index.php"  # xkcd.com/1742/
 
-    def __init__(self, min_delay: float = 1.0, max_delay: float = 3.0, output_dir: Optional[Path] = None):
+    def __init__(self, min_delay: float = 1.0, max_delay: float = 3.0, output_dir: Optional[Path] = None, max_workers: int = 8):
         """
         Initialize the XKCD scraper.
 
         Args:
-            min_delay: Minimum delay between requests in seconds
-            max_delay: Maximum delay between requests in seconds
+            min_delay: Minimum delay between requests to the same host in seconds (web pages only, not S3)
+            max_delay: Maximum delay between requests to the same host in seconds (web pages only, not S3)
             output_dir: Directory to save scraped data
+            max_workers: Maximum number of comics fetched concurrently
         """
         self.min_delay = min_delay
         self.max_delay = max_delay
         self.output_dir = output_dir
+        self.max_workers = max_workers
         self.error_ids = []  # Track comic IDs that fail to scrape
+        self._error_lock = threading.Lock()  # error_ids is appended to from the worker threads
+        self._scraped_ids: Optional[Set[int]] = None  # IDs saved in output_dir, listed once per iter_comics run
         if output_dir:
             output_dir.mkdir(parents=True, exist_ok=True)
 
-    def scrape_comic(self, comic_id: int) -> Optional[Comic]:
+        # One session for all requests, so that connections are kept alive and reused across comics
+        self.session = requests.Session()
+        self.session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.5))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.host_limiter = HostLimiter(min_delay, max_delay)
+
+        # One S3 client shared by all worker threads (created on first use)
+        self._s3_client = None
+        self._s3_client_lock = threading.Lock()
+
+        # Validators of previously scraped pages, so that unchanged pages can be skipped with conditional requests
+        self._validators: Dict[str, Dict[str, str]] = self._load_validators()
+        self._validators_changed = False
+
+    def close(self) -> None:
+        """Save the page validators and close the HTTP session, releasing its pooled connections."""
+        self._save_validators()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def scrape_comic(self, comic_id: int, existing: Optional[Comic] = None) -> Optional[Comic]:
         """
         Scrape a specific comic by ID.
 
         Args:
             comic_id: ID of the comic to scrape
+            existing: Previously retrieved version of the comic (e.g. from S3); if it has an image URL,
+                xkcd.com is not requested again
 
         Returns:
             Comic object with the scraped data or None if scraping failed
@@ -78,36 +239,46 @@ class XKCDScraper:
         url = f"{self.BASE_URL}/{comic_id}"
 
         try:
-            # Add headers with a custom user agent
-            logger.info(f"Scraping comic {comic_id} from {url}")
-            headers = {
-                "User-Agent": USER_AGENT,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5"
-            }
-            response = requests.get(url, headers=headers)
+            # If the comic has been saved before, only download its page again if it has changed since
+            saved_comic, conditional_headers = None, {}
+            validators = self._validators.get(url)
+            if validators and self._is_comic_scraped(comic_id):
+                saved_comic = next(load_comics_from_files(comics_dir=self.output_dir, comic_ids=[comic_id]), None)
+                if saved_comic:
+                    if 'etag' in validators:
+                        conditional_headers['If-None-Match'] = validators['etag']
+                    if 'last_modified' in validators:
+                        conditional_headers['If-Modified-Since'] = validators['last_modified']
+
+            logger.info("Scraping comic %d from %s", comic_id, url)
+            self.host_limiter.wait(url)
+            response = self.session.get(url, headers=conditional_headers)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if response.status_code == 304 and saved_comic:
+                logger.info("Comic %d is unchanged since it was saved", comic_id)
+                return saved_comic
 
-            # Get xkcd.com page for image extraction
-            xkcd_url = f"https://xkcd.com/{comic_id}/"
-            logger.info(f"Scraping image URL for comic {comic_id} from {xkcd_url}")
-            xkcd_response = requests.get(xkcd_url, headers=headers)
-            xkcd_response.raise_for_status()
-            xkcd_soup = BeautifulSoup(xkcd_response.text, 'html.parser')
+            page = _parse_page(response.content)
 
-            # Extract title
-            title = self._extract_title(soup)
+            # The image URL doesn't change, so only get the xkcd.com page if it isn't known already
+            known_comic = existing or saved_comic
+            if known_comic and known_comic.image_url:
+                image_url = known_comic.image_url
+            else:
+                xkcd_url = f"https://xkcd.com/{comic_id}/"
+                logger.info("Scraping image URL for comic %d from %s", comic_id, xkcd_url)
+                self.host_limiter.wait(xkcd_url)
+                xkcd_response = self.session.get(xkcd_url)
+                xkcd_response.raise_for_status()
+                xkcd_page = _parse_page(xkcd_response.content)
 
-            # Extract image URL from xkcd.com
-            image_url = self._extract_image_url(xkcd_soup)
+                # Extract image URL from xkcd.com
+                image_url = self._extract_image_url(xkcd_page)
 
-            # Extract explanation
-            explanation = self._extract_explanation(soup)
+            title, explanation, transcript = self._parse_explain(page)
 
-            # Extract transcript
-            transcript = self._extract_transcript(soup)
+            self._remember_validators(url, response)
 
             return Comic(
                 comic_id=comic_id,
@@ -119,9 +290,68 @@ class XKCDScraper:
 
         except Exception as e:
             logger.error(f"Error scraping comic {comic_id}: {str(e)}", exc_info=True)
-            self.error_ids.append(comic_id)  # Add to error list
+            self._record_error(comic_id)
             return None
 
+    def _load_validators(self) -> Dict[str, Dict[str, str]]:
+        """
+        Load the ETag / Last-Modified headers of previously scraped pages from the output directory.
+
+        Returns:
+            Dict mapping page URL to its validators ('etag' and/or 'last_modified')
+        """
+        if not self.output_dir:
+            return {}
+
+        validators_path = self.output_dir / VALIDATORS_FILENAME
+        if not validators_path.exists():
+            return {}
+
+        try:
+            return orjson.loads(validators_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"Error loading page validators from {validators_path}: {str(e)}")
+            return {}
+
+    def _save_validators(self) -> None:
+        """Save the ETag / Last-Modified headers of scraped pages to the output directory (if any have changed)."""
+        if not (self.output_dir and self._validators_changed):
+            return
+
+        try:
+            (self.output_dir / VALIDATORS_FILENAME).write_bytes(orjson.dumps(self._validators))
+            self._validators_changed = False
+        except Exception as e:
+            logger.error(f"Error saving page validators: {str(e)}")
+
+    def _remember_validators(self, url: str, response: requests.Response) -> None:
+        """
+        Record the ETag / Last-Modified headers of a page, for conditional requests on later runs.
+
+        Args:
+            url: URL of the page
+            response: Response the page was downloaded in
+        """
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['last_modified'] = response.headers['Last-Modified']
+
+        if validators and self._validators.get(url) != validators:
+            self._validators[url] = validators
+            self._validators_changed = True
+
+    @property
+    def s3_client(self):
+        """S3 client, created once and shared across threads (with a connection pool sized for max_workers)."""
+        if self._s3_client is None:
+            with self._s3_client_lock:
+                if self._s3_client is None:
+                    config = BotoConfig(max_pool_connections=max(10, self.max_workers))
+                    self._s3_client = boto3.session.Session().client('s3', config=config)
+        return self._s3_client
+
     def get_comic_from_aws(self, comic_id: int, bucket: str = S3_COMIC_BUCKET, key_prefix: str = S3_COMIC_KEY_PREFIX) -> Optional[Comic]:
         """
         Get a specific comic from AWS S3.
@@ -135,14 +365,13 @@ class XKCDScraper:
             Comic object with the data from S3 or None if retrieval failed
         """
         key = f"{key_prefix}/comic_{comic_id}.json"
-        logger.info(f"Retrieving comic {comic_id} from S3 bucket {bucket}, key {key}")
+        logger.info("Retrieving comic %d from S3 bucket %s, key %s", comic_id, bucket, key)
 
         try:
-            s3_client = boto3.client('s3')
-            response = s3_client.get_object(Bucket=bucket, Key=key)
+            response = self.s3_client.get_object(Bucket=bucket, Key=key)
 
-            # Read and parse JSON
-            json_data = json.loads(response['Body'].read().decode('utf-8'))
+            # Read and parse JSON (orjson parses the UTF-8 bytes directly, without decoding them to str first)
+            json_data = orjson.loads(response['Body'].read())
 
             # Create Comic object from JSON data
             return Comic(
@@ -159,11 +388,50 @@ class XKCDScraper:
                 logger.warning(f"Comic {comic_id} not found in S3 bucket {bucket}")
             else:
                 logger.error(f"AWS error retrieving comic {comic_id}: {str(e)}")
+            self._record_error(comic_id)
             return None
         except Exception as e:
             logger.error(f"Error retrieving comic {comic_id} from S3: {str(e)}", exc_info=True)
+            self._record_error(comic_id)
+            return None
+
+    def _record_error(self, comic_id: int) -> None:
+        """
+        Add a comic to the list of comics that failed to scrape (safe to call from worker threads).
+
+        Args:
+            comic_id: ID of the comic that failed
+        """
+        with self._error_lock:
+            self.error_ids.append(comic_id)
+
+    def _s3_index(self, bucket: str = S3_COMIC_BUCKET, key_prefix: str = S3_COMIC_KEY_PREFIX) -> Optional[Set[int]]:
+        """
+        List the IDs of the comics available in S3.
+
+        Args:
+            bucket: S3 bucket name
+            key_prefix: S3 key prefix/path within bucket (e.g.: "xkcd/comics")
+
+        Returns:
+            Set of comic IDs, or None if the bucket could not be listed
+        """
+        prefix = f"{key_prefix}/comic_"
+        available_ids = set()
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    name = obj['Key'][len(prefix):]
+                    if name.endswith(".json") and name[:-len(".json")].isdigit():
+                        available_ids.add(int(name[:-len(".json")]))
+        except Exception as e:
+            logger.warning(f"Could not list S3 bucket {bucket} (falling back to per-comic requests): {str(e)}")
             return None
 
+        logger.info(f"Found {len(available_ids)} comics in S3 bucket {bucket}")
+        return available_ids
+
     def _is_comic_scraped(self, comic_id: int) -> bool:
         """
         Check if a comic has already been scraped.
@@ -177,49 +445,138 @@ class XKCDScraper:
         if not self.output_dir:
             return False
 
+        if self._scraped_ids is not None:
+            return comic_id in self._scraped_ids
+
         filename = self.output_dir / f"comic_{comic_id}.json"
         return filename.exists()
 
-    def scrape_comics(self, comic_ids: Union[List[int], range]) -> List[Comic]:
+    def _list_scraped_ids(self) -> Set[int]:
         """
-        Scrape multiple comics by their IDs.
+        List the IDs of the comics already saved in the output directory.
+
+        Returns:
+            Set of comic IDs (empty if there is no output directory)
+        """
+        if not self.output_dir or not self.output_dir.exists():
+            return set()
+
+        scraped_ids = set()
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("comic_") and name.endswith(".json"):
+                    try:
+                        scraped_ids.add(int(name[len("comic_"):-len(".json")]))
+                    except ValueError:
+                        continue
+        return scraped_ids
+
+    def _fetch_comic(self, comic_id: int) -> Tuple[Optional[Comic], bool]:
+        """
+        Fetch a single comic, loading it from the output directory if it has already been scraped.
 
         Args:
-            comic_ids: List of comic IDs to scrape
+            comic_id: ID of the comic to fetch
 
         Returns:
-            List of Comic objects
+            Tuple of (Comic object or None if retrieval failed, whether the comic was newly downloaded)
         """
-        comics = []
-        self.error_ids = []  # Reset error IDs for this run
-        total_comics = len(list(comic_ids))
+        # Skip comics that have already been scraped
+        if self._is_comic_scraped(comic_id):
+            logger.info("Skipping already scraped comic ID: %d", comic_id)
+            return next(load_comics_from_files(comics_dir=self.output_dir, comic_ids=[comic_id]), None), False
 
-        for k, comic_id in enumerate(comic_ids):
-            if comic_id <= 0:
-                logger.warning(f"Skipping invalid comic ID: {comic_id}")
-                continue
+        return self.get_comic_from_aws(comic_id), True
 
-            # Skip comics that have already been scraped
-            if self._is_comic_scraped(comic_id):
-                logger.info(f"Skipping already scraped comic ID: {comic_id}")
-                comics.extend(load_comics_from_files(comics_dir=self.output_dir, comic_ids=[comic_id]))
-                continue
+    def iter_comics(self, comic_ids: Iterable[int]) -> Iterator[Comic]:
+        """
+        Scrape multiple comics by their IDs, yielding each one as soon as it is available.
 
-            if k > 0 and k % 100 == 0:
-                logger.info(f"Progress scraping comic {k+1}/{total_comics}: {comic_id}")
+        This is a pipeline: up to max_workers comics are fetched concurrently (so that the network latency of the
+        requests overlaps), while the consumer yields each comic on, e.g. into a database import,
+        as the remaining downloads continue. New comics are handed to a single writer thread that saves them to
+        output_dir. Comics are yielded in the order of comic_ids.
 
-            comic = self.get_comic_from_aws(comic_id)
-            if comic:
-                comics.append(comic)
+        Args:
+            comic_ids: Comic IDs to scrape (any iterable, e.g. a list, range or generator)
 
-                # Save comic to file if output directory is specified
-                if self.output_dir:
-                    self._save_comic(comic)
+        Yields:
+            Comic objects
+        """
+        self.error_ids = []  # Reset error IDs for this run
+        # One directory listing up front, rather than a stat() per comic
+        self._scraped_ids = self._list_scraped_ids()
 
-            # Sleep with random delay to avoid overloading the server
-            delay = random.uniform(self.min_delay, self.max_delay)
-            logger.debug(f"Waiting {delay:.2f} seconds before next request")
-            time.sleep(delay)
+        valid_ids = []
+        for comic_id in comic_ids:
+            if comic_id <= 0:
+                logger.warning(f"Skipping invalid comic ID: {comic_id}")
+                continue
+            valid_ids.append(comic_id)
+
+        # For large downloads, list the bucket once rather than paying a failed GetObject for every missing comic
+        num_to_download = sum(1 for comic_id in valid_ids if not self._is_comic_scraped(comic_id))
+        if num_to_download >= S3_INDEX_MIN_COMICS:
+            available_ids = self._s3_index()
+            if available_ids is not None:
+                missing_ids = [
+                    comic_id for comic_id in valid_ids
+                    if comic_id not in available_ids and not self._is_comic_scraped(comic_id)
+                ]
+                for comic_id in missing_ids:
+                    logger.warning(f"Comic {comic_id} not found in S3 bucket {S3_COMIC_BUCKET}")
+                    self._record_error(comic_id)
+                if missing_ids:
+                    missing = set(missing_ids)
+                    valid_ids = [comic_id for comic_id in valid_ids if comic_id not in missing]
+        total_comics = len(valid_ids)
+
+        # Save comics to files (if output directory is specified) on a separate thread, so writes don't hold up the consumer
+        save_queue, writer = None, None
+        if self.output_dir:
+            save_queue = queue.Queue(maxsize=SAVE_QUEUE_SIZE)
+            writer = threading.Thread(target=self._write_comics, args=(save_queue,), name="comic-writer", daemon=True)
+            writer.start()
+
+        # Only submit a bounded number of fetches ahead of the consumer, so that stopping early doesn't have to wait
+        # for (or cancel) a download of every remaining comic
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        ids_to_submit = iter(valid_ids)
+        try:
+            for comic_id in islice(ids_to_submit, FETCH_AHEAD_PER_WORKER * self.max_workers):
+                pending.append(executor.submit(self._fetch_comic, comic_id))
+
+            k = 0
+            while pending:
+                comic, downloaded = pending.popleft().result()
+                next_id = next(ids_to_submit, None)
+                if next_id is not None:
+                    pending.append(executor.submit(self._fetch_comic, next_id))
+
+                if k > 0 and k % 100 == 0:
+                    logger.info(f"Progress scraping comic {k+1}/{total_comics}: {valid_ids[k]}")
+                k += 1
+                if not comic:
+                    continue
+
+                if downloaded and save_queue is not None:
+                    save_queue.put(comic)
+                yield comic
+        finally:
+            # Drop the fetches that haven't started (when the consumer stops early), only waiting for running ones
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+            # Wait for the queued comics to be written (also when the consumer stops early)
+            if writer is not None:
+                save_queue.put(None)
+                writer.join()
+
+            # The listing is only valid for this run (files may be added or removed before the next one)
+            self._scraped_ids = None
 
         # Print error summary at the end
         if self.error_ids:
@@ -227,33 +584,108 @@ class XKCDScraper:
         else:
             logger.info("All comics scraped successfully")
 
-        return comics
+    def scrape_comics(self, comic_ids: Iterable[int]) -> List[Comic]:
+        """
+        Scrape multiple comics by their IDs.
+
+        Args:
+            comic_ids: Comic IDs to scrape (any iterable, e.g. a list, range or generator)
+
+        Returns:
+            List of Comic objects, in the order of comic_ids
+        """
+        return list(self.iter_comics(comic_ids))
+
+    @staticmethod
+    def range_comic_ids(start_id: int, num_comics: int = 10, shuffle: bool = False) -> List[int]:
+        """
+        Get the IDs of a range of comics, counting backwards from start_id.
+
+        Args:
+            start_id: ID to start the range from
+            num_comics: Number of comics in the range
+            shuffle: Whether to randomize the order of the IDs (default: keep them in order, which keeps
+                re-runs of a partially scraped range predictable)
+
+        Returns:
+            List of comic IDs
+        """
+        comic_ids = [start_id - i for i in range(num_comics) if start_id - i > 0]
+        if shuffle:
+            random.shuffle(comic_ids)
+        return comic_ids
 
-    def scrape_comics_by_range(self, start_id: int, num_comics: int = 10) -> List[Comic]:
+    def scrape_comics_by_range(self, start_id: int, num_comics: int = 10, shuffle: bool = False) -> List[Comic]:
         """
         Scrape multiple comics by specifying a range.
 
         Args:
             start_id: ID to start scraping from
             num_comics: Number of comics to scrape
+            shuffle: Whether to scrape the comics in random order
 
         Returns:
             List of Comic objects
         """
-        comic_ids = [start_id - i for i in range(num_comics) if start_id - i > 0]
-        random.shuffle(comic_ids)  # Randomize the order of comic IDs
-        return self.scrape_comics(comic_ids)
+        return self.scrape_comics(self.range_comic_ids(start_id, num_comics, shuffle=shuffle))
+
+    def _parse_explain(self, page: lxml.html.HtmlElement) -> Tuple[str, str, str]:
+        """
+        Extract the text of a comic from its (parsed) explainxkcd page.
+
+        Args:
+            page: Parsed explainxkcd page
+
+        Returns:
+            Tuple of the comic's title, explanation and transcript
+        """
+        # Locate the title and section headers in a single pass over the page
+        landmarks = self._find_landmarks(page)
+
+        # Extract title
+        title = self._extract_title(landmarks.get('h1'))
+
+        # Extract explanation
+        explanation = self._extract_explanation(landmarks.get('Explanation'))
+
+        # Extract transcript
+        transcript = self._extract_transcript(landmarks.get('Transcript'))
+
+        return title, explanation, transcript
+
+    @staticmethod
+    def _find_landmarks(page: lxml.html.HtmlElement) -> Dict[str, lxml.html.HtmlElement]:
+        """
+        Find the elements the fields are extracted from, in one traversal of the page (stopping once all are found).
+
+        Args:
+            page: Parsed explainxkcd page
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
-        """Extract the title of the comic."""
+        Returns:
+            Dict with the first 'h1' (the title) and the spans with IDs 'Explanation' and 'Transcript'
+            (inside their sections' h2 headers); keys are missing for elements not on the page
+        """
+        landmarks = {}
+        for element in page.iter('h1', 'span'):
+            if element.tag == 'h1':
+                landmarks.setdefault('h1', element)
+            else:
+                span_id = element.get('id')
+                if span_id not in _SECTION_IDS:
+                    continue
+                landmarks.setdefault(span_id, element)
+            if len(landmarks) == len(_SECTION_IDS) + 1:
+                break
+        return landmarks
+
+    def _extract_title(self, title_element: Optional[lxml.html.HtmlElement]) -> str:
+        """Extract the title of the comic from its h1 element."""
         try:
-            # Try to find the title from the page
-            title_element = soup.select_one("h1")
-            if title_element:
-                title_text = title_element.get_text().strip()
+            if title_element is not None:
+                title_text = title_element.text_content().strip()
                 # The title usually follows the format: "605: Extrapolating"
                 # We want to extract "Extrapolating"
-                match = re.search(r'(\d+):\s*(.*)', title_text)
+                match = _TITLE_RE.match(title_text)
                 if match:
                     return match.group(2)
                 return title_text
@@ -262,13 +694,13 @@ class XKCDScraper:
 
         return "Unknown"
 
-    def _extract_image_url(self, xkcd_soup: BeautifulSoup) -> Optional[str]:
+    def _extract_image_url(self, xkcd_page: lxml.html.HtmlElement) -> Optional[str]:
         """Extract the URL of the comic image from xkcd.com."""
         try:
             # Extract image URL from xkcd.com
-            image_element = xkcd_soup.select_one("#comic img")
-            if image_element and 'src' in image_element.attrs:
-                src = image_element['src']
+            image_srcs = XKCD_IMAGE_SRC_XPATH(xkcd_page)
+            if image_srcs:
+                src = str(image_srcs[0])
                 # Make sure the URL is absolute
                 if src.startswith('//'):
                     return f"https:{src}"
@@ -280,102 +712,68 @@ class XKCDScraper:
 
         return None
 
-    def _extract_explanation(self, soup: BeautifulSoup) -> str:
+    @staticmethod
+    def _extract_section(section_header: Optional[lxml.html.HtmlElement], handlers: dict) -> Optional[str]:
+        """
+        Extract the text of a section: the elements between its h2 header and the next h2.
+
+        Args:
+            section_header: Span (with the section's ID) inside the section's h2 header
+            handlers: Mapping of tag name to the function rendering elements with that tag
+
+        Returns:
+            The section's text, or None if the page has no such section
+        """
+        if section_header is None or section_header.getparent() is None:
+            return None
+
+        parts = []
+        for element in section_header.getparent().itersiblings():
+            if element.tag == 'h2':
+                break
+            handler = handlers.get(element.tag)
+            if handler:
+                handler(element, parts)
+
+        return "".join(parts).strip()
+
+    def _extract_explanation(self, explanation_header: Optional[lxml.html.HtmlElement]) -> str:
         """Extract the explanation of the comic."""
         try:
             # The explanation is usually in a section after an h2 with "Explanation"
-            explanation_header = soup.find('span', {'id': 'Explanation'})
-            if explanation_header and explanation_header.parent:
-                explanation_section = explanation_header.parent
-                explanation_text = ""
-
-                # Collect all paragraphs until the next h2
-                current = explanation_section.next_sibling
-                while current and (current.name != 'h2'):
-                    if current.name == 'p':
-                        explanation_text += current.get_text() + "\n\n"
-                    # Handle unordered lists
-                    elif current.name == 'ul':
-                        for li in current.find_all('li'):
-                            explanation_text += "• " + li.get_text().strip() + "\n"
-                        explanation_text += "\n"
-                    # Handle ordered lists
-                    elif current.name == 'ol':
-                        for i, li in enumerate(current.find_all('li'), 1):
-                            explanation_text += f"{i}. " + li.get_text().strip() + "\n"
-                        explanation_text += "\n"
-                    # Handle blockquotes and other container elements
-                    elif current.name in ['blockquote', 'div'] and current.find(['ul', 'ol']):
-                        # Process lists inside blockquotes or divs
-                        for list_elem in current.find_all(['ul', 'ol']):
-                            if list_elem.name == 'ul':
-                                for li in list_elem.find_all('li'):
-                                    explanation_text += "• " + li.get_text().strip() + "\n"
-                                explanation_text += "\n"
-                            elif list_elem.name == 'ol':
-                                for i, li in enumerate(list_elem.find_all('li'), 1):
-                                    explanation_text += f"{i}. " + li.get_text().strip() + "\n"
-                                explanation_text += "\n"
-                    # Include headers for structure
-                    elif current.name in ['h3', 'h4', 'h5', 'h6']:
-                        explanation_text += current.get_text().strip() + "\n\n"
-
-                    current = current.next_sibling
-
-                return explanation_text.strip()
+            explanation = self._extract_section(explanation_header, _EXPLANATION_HANDLERS)
+            if explanation is not None:
+                return explanation
         except Exception as e:
             logger.warning(f"Error extracting explanation: {str(e)}")
 
         return "No explanation available"
 
-    def _extract_transcript(self, soup: BeautifulSoup) -> str:
+    def _extract_transcript(self, transcript_header: Optional[lxml.html.HtmlElement]) -> str:
         """Extract the transcript of the comic."""
         try:
             # The transcript is usually in a section after an h2 with "Transcript"
-            transcript_header = soup.find('span', {'id': 'Transcript'})
-            if transcript_header and transcript_header.parent:
-                transcript_section = transcript_header.parent
-                transcript_text = ""
-
-                # Collect all elements until the next h2
-                current = transcript_section.next_sibling
-                while current and (current.name != 'h2'):
-                    if current.name in ['p', 'pre', 'dl', 'dd']:
-                        transcript_text += current.get_text() + "\n\n"
-                    # Handle unordered lists
-                    elif current.name == 'ul':
-                        for li in current.find_all('li'):
-                            transcript_text += "• " + li.get_text().strip() + "\n"
-                        transcript_text += "\n"
-                    # Handle ordered lists
-                    elif current.name == 'ol':
-                        for i, li in enumerate(current.find_all('li'), 1):
-                            transcript_text += f"{i}. " + li.get_text().strip() + "\n"
-                        transcript_text += "\n"
-                    # Handle blockquotes and other container elements
-                    elif current.name in ['blockquote', 'div'] and current.find(['ul', 'ol']):
-                        # Process lists inside blockquotes or divs
-                        for list_elem in current.find_all(['ul', 'ol']):
-                            if list_elem.name == 'ul':
-                                for li in list_elem.find_all('li'):
-                                    transcript_text += "• " + li.get_text().strip() + "\n"
-                                transcript_text += "\n"
-                            elif list_elem.name == 'ol':
-                                for i, li in enumerate(list_elem.find_all('li'), 1):
-                                    transcript_text += f"{i}. " + li.get_text().strip() + "\n"
-                                transcript_text += "\n"
-                    # Include headers for structure
-                    elif current.name in ['h3', 'h4', 'h5', 'h6']:
-                        transcript_text += current.get_text().strip() + "\n\n"
-
-                    current = current.next_sibling
-
-                return transcript_text.strip()
+            transcript = self._extract_section(transcript_header, _TRANSCRIPT_HANDLERS)
+            if transcript is not None:
+                return transcript
         except Exception as e:
             logger.warning(f"Error extracting transcript: {str(e)}")
 
         return "No transcript available"
 
+    def _write_comics(self, save_queue: queue.Queue) -> None:
+        """
+        Save the comics put on a queue until a None sentinel is received (run on the writer thread).
+
+        Args:
+            save_queue: Queue of Comic objects to save
+        """
+        while True:
+            comic = save_queue.get()
+            if comic is None:
+                break
+            self._save_comic(comic)
+
     def _save_comic(self, comic: Comic) -> None:
         """
         Save a comic to a JSON file.
@@ -398,10 +796,30 @@ class XKCDScraper:
                 "transcript": comic.transcript
             }
 
-            # Save as JSON
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(comic_dict, f, indent=2, ensure_ascii=False)
-
-            logger.info(f"Saved comic {comic.comic_id} to {filename}")
+            # Save as compact UTF-8 JSON (the files are read by the loaders, not by people), written unbuffered
+            # to a temporary file that is swapped in, so an interrupted save never leaves a truncated comic file
+            tmp_filename = filename.with_name(f"{filename.name}.tmp")
+            data = memoryview(orjson.dumps(comic_dict))
+            fd = os.open(tmp_filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                try:
+                    # os.write may write only part of the buffer, so write until all of it is out
+                    while data:
+                        data = data[os.write(fd, data):]
+                finally:
+                    os.close(fd)
+                os.replace(tmp_filename, filename)
+            except Exception:
+                try:
+                    os.unlink(tmp_filename)
+                except OSError:
+                    pass
+                raise
+
+            # Keep the listing of saved comics current, rather than re-listing the directory
+            if self._scraped_ids is not None:
+                self._scraped_ids.add(comic.comic_id)
+
+            logger.info("Saved comic %d to %s", comic.comic_id, filename)
         except Exception as e:
             logger.error(f"Error saving comic {comic.comic_id}: {str(e)}")
\ No newline at end of file
@@ -15,38 +15,56 @@
 
 """
 Weaviate client for retrieving XKCD comic data.
+
+Share one XKCDWeaviateClient across searches (and threads): its connection and connection pool are reused,
+rather than opening a new connection per search.
 """
 
 import logging
-from typing import Dict, List
-
-import weaviate.classes as wvc
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
 
-from ..database.weaviate_client import XKCDWeaviateClient
+# The weaviate client is imported where it is used, so that --help and argument errors don't pay for importing it
+if TYPE_CHECKING:
+    from ..database.weaviate_client import XKCDWeaviateClient
 
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Lightweight properties returned by default (explanation / transcript are large text fields)
+DEFAULT_FIELDS = ("comic_id", "title", "image_url")
+
+# Prompt for the RAG summary of each comic: {title} and {explanation} are filled in by Weaviate, {user_query} by us
+RAG_PROMPT_TEMPLATE = ("Explain this XKCD comic in exactly two sentences: {title}. "
+                       "Then explain in one more sentence how it relates to: {user_query}. "
+                       "Make it funny / light-hearted. "
+                       "Here is a long description to use as context: {explanation}.")
+
 
 def search_comics(
-        client: XKCDWeaviateClient,
+        client: "XKCDWeaviateClient",
         query: str,
         limit: int = 5,
         alpha: float = 1,
         do_rag: bool = False,
         max_id: int = None,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        sem_cache=None,
+        query_vector: Optional[Sequence[float]] = None,
 ) -> List[Dict]:
     """
     Search for comics in Weaviate using semantic search.
 
     Args:
-        client: the bespoke XKCD client for connecting to weaviate DB
+        client: the bespoke XKCD client for connecting to weaviate DB (reuse it across searches to keep the connection)
         query: Query string to search for
         limit: Maximum number of results to return
         alpha: float, the strength of semantics in the hybrid search
         do_rag: bool, whether to make generative output
         max_id: int, optionally specify a maximum comic ID
+        fields: properties to return for each comic (the RAG prompt can use any property regardless)
+        sem_cache: optional SemCache; near-identical earlier queries (with the same options) are answered from it
+        query_vector: optional precomputed embedding of the query (same model as the schema's vectorizer),
+            so that neither Weaviate nor the semantic cache has to embed the query
 
     Returns:
         List of dictionaries containing found comics
@@ -54,38 +72,52 @@ def search_comics(
     try:
         logger.info(f"Searching for comics with query: '{query}'")
 
+        # Answer repeated queries from the semantic cache, if one is used
+        cache_vector, cache_params = None, (limit, alpha, do_rag, max_id, tuple(fields))
+        if sem_cache is not None:
+            cache_vector = sem_cache.embed(query) if query_vector is None else sem_cache.normalize(query_vector)
+            cached = sem_cache.get(cache_vector, cache_params)
+            if cached is not None:
+                logger.info(f"Found {len(cached)} comics matching query (cached)")
+                return cached
+            if query_vector is None:
+                query_vector = cache_vector
+
+        # The query embedding (if known) is sent along, so that Weaviate doesn't vectorize the query again
+        vector = [float(x) for x in query_vector] if query_vector is not None else None
+
         # Get the collection
         collection = client.client.collections.get("XKCDComic")
 
         # Build the where filter if max_id is specified
         where_filter = None
         if max_id:
+            import weaviate.classes as wvc
             where_filter = wvc.query.Filter.by_property("comic_id").less_than(max_id)
 
         # Execute the hybrid search
         if do_rag:
             # For RAG, use the generate method
-            single_prompt = ("Explain this XKCD comic in exactly two sentences: {title}. "
-                             f"Then explain in one more sentence how it relates to: {query}. "
-                             "Make it funny / light-hearted. "
-                             "Here is a long description to use as context: {explanation}.")
+            single_prompt = RAG_PROMPT_TEMPLATE.replace("{user_query}", query)
 
             response = collection.generate.hybrid(
                 query=query,
+                vector=vector,
                 alpha=alpha,
                 limit=limit,
                 filters=where_filter,
-                return_properties=["comic_id", "title", "image_url", "explanation", "transcript"],
+                return_properties=list(fields),
                 single_prompt=single_prompt
             )
         else:
             # Regular hybrid search without generation
             response = collection.query.hybrid(
                 query=query,
+                vector=vector,
                 alpha=alpha,
                 limit=limit,
                 filters=where_filter,
-                return_properties=["comic_id", "title", "image_url", "explanation", "transcript"]
+                return_properties=list(fields)
             )
 
         # Convert response objects to dictionaries for backward compatibility
@@ -104,6 +136,8 @@ def search_comics(
             comics.append(comic)
 
         logger.info(f"Found {len(comics)} comics matching query")
+        if sem_cache is not None:
+            sem_cache.put(cache_vector, cache_params, comics)
         return comics
 
     except Exception as e:
@@ -114,13 +148,16 @@ def main():
     import argparse
     import sys
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     parser = argparse.ArgumentParser(description='XKCD Search With Weaviate')
     parser.add_argument('--query', type=str, required=True, help='Search for comics with the given query')
     parser.add_argument('--do-rag', action="store_true", help='Whether or not to add a generative summary of the comic.')
     parser.add_argument('--limit', type=int, default=3, help='Limit number of search results (default: 3)')
+    parser.add_argument('--full', action="store_true", help='Also fetch and show (a preview of) each comic\'s explanation.')
     parser.add_argument('--alpha', type=float, default=0.5, help='alpha value to determine weight of semantics in hybrid search (note: 1 => fully semantic)')
     parser.add_argument('--weaviate-host', type=str, default='localhost', help='Host of Weaviate instance (default: localhost)')
     parser.add_argument('--weaviate-port', type=int, default=8080, help='Port of Weaviate instance (default: 8080)')
+    parser.add_argument('--grpc-port', type=int, default=50051, help='gRPC port of Weaviate instance, used for the searches (default: 50051)')
     parser.add_argument('--timeout', type=int, default=30, help='Timeout for requests in seconds (default: 30)')
     args = parser.parse_args()
 
@@ -128,16 +165,20 @@ def main():
         parser.print_help()
         return
 
+    from ..database.weaviate_client import XKCDWeaviateClient
+
     client = None
     try:
         client = XKCDWeaviateClient(
             weaviate_host=args.weaviate_host,
             weaviate_port=args.weaviate_port,
+            grpc_port=args.grpc_port,
             timeout=args.timeout
         )
 
         print(f"Searching for comics with query: '{args.query}'")
-        results = search_comics(client=client, query=args.query, limit=args.limit, alpha=args.alpha, do_rag=args.do_rag)
+        fields = DEFAULT_FIELDS + ("explanation",) if args.full else DEFAULT_FIELDS
+        results = search_comics(client=client, query=args.query, limit=args.limit, alpha=args.alpha, do_rag=args.do_rag, fields=fields)
 
         if results:
             print(f"Found {len(results)} results:")
@@ -149,7 +190,8 @@ def main():
                     explanation = generate_response.get('singleResult', comic.get('explanation'))
                 elif comic.get('explanation'):
                     explanation = comic['explanation'][:200] + "..." if len(comic['explanation']) > 200 else comic['explanation']
-                print(f"   Explanation: {explanation}")
+                if explanation:
+                    print(f"   Explanation: {explanation}")
         else:
             print("No results found.")
 
@@ -0,0 +1,141 @@
+#  Copyright (C) 2025 lukerm of www.zl-labs.tech
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+In-process semantic cache of search results, so repeated (or near-identical) queries skip Weaviate and the LLM.
+
+Queries are matched by the cosine similarity of their embeddings, and only for the same search parameters.
+"""
+import logging
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+from ..database.weaviate_client import EMBEDDING_MODEL
+
+logger = logging.getLogger(__name__)
+
+
+class SemCache:
+    """Search results keyed by query embedding, evicting the least recently used entry when full."""
+
+    def __init__(self, threshold: float = 0.97, capacity: int = 1024, model: str = EMBEDDING_MODEL):
+        """
+        Initialize an empty cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a previous query's results to be reused
+            capacity: Maximum number of queries to cache
+            model: OpenAI embedding model for queries (should match the vectorizer model in the Weaviate schema)
+        """
+        self.threshold = threshold
+        self.capacity = capacity
+        self.model = model
+        self._openai_client = None
+
+        self._vectors: Optional[np.ndarray] = None  # (capacity, dim) normalized query embeddings, allocated on first put
+        self._params: List[Hashable] = []
+        self._results: List[List[Dict]] = []
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def embed(self, query: str) -> np.ndarray:
+        """
+        Embed a query with OpenAI.
+
+        Args:
+            query: Query string
+
+        Returns:
+            The normalized embedding of the query
+        """
+        if self._openai_client is None:
+            import openai
+            self._openai_client = openai.OpenAI()
+
+        response = self._openai_client.embeddings.create(model=self.model, input=query)
+        return self.normalize(response.data[0].embedding)
+
+    @staticmethod
+    def normalize(vector) -> np.ndarray:
+        """
+        Convert a (precomputed) query embedding to the form used by the cache.
+
+        Args:
+            vector: Query embedding, as a sequence of floats
+
+        Returns:
+            The embedding as a unit-length float32 array
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(self, query_vector: np.ndarray, params: Hashable) -> Optional[List[Dict]]:
+        """
+        Get the results of the most similar cached query with the same search parameters.
+
+        Args:
+            query_vector: Normalized embedding of the query (from embed or normalize)
+            params: Search parameters the results depend on (e.g. limit, alpha)
+
+        Returns:
+            Copies of the cached result dicts, or None if no cached query is similar enough
+        """
+        if not self._results:
+            return None
+
+        scores = self._vectors[:len(self._results)] @ query_vector
+        for i in np.argsort(scores)[::-1]:
+            if scores[i] < self.threshold:
+                break
+            if self._params[i] == params:
+                self._touch(i)
+                logger.debug("Semantic cache hit (similarity %.3f)", scores[i])
+                return [dict(result) for result in self._results[i]]
+
+        return None
+
+    def put(self, query_vector: np.ndarray, params: Hashable, results: List[Dict]) -> None:
+        """
+        Cache the results of a query.
+
+        Args:
+            query_vector: Normalized embedding of the query (from embed or normalize)
+            params: Search parameters the results depend on
+            results: Result dicts to return for similar queries
+        """
+        if self._vectors is None:
+            self._vectors = np.empty((self.capacity, len(query_vector)), dtype=np.float32)
+
+        results = [dict(result) for result in results]
+        if len(self._results) < self.capacity:
+            i = len(self._results)
+            self._params.append(params)
+            self._results.append(results)
+        else:
+            # Overwrite the least recently used entry in place
+            i = int(np.argmin(self._last_used))
+            self._params[i] = params
+            self._results[i] = results
+
+        self._vectors[i] = query_vector
+        self._touch(i)
+
+    def _touch(self, i: int) -> None:
+        """Mark an entry as the most recently used."""
+        self._clock += 1
+        self._last_used[i] = self._clock
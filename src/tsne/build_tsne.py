@@ -12,83 +12,128 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import openai
+import orjson
 import pandas as pd
 from dotenv import load_dotenv; load_dotenv()
-from sklearn.manifold import TSNE
+from openTSNE import TSNE
+from sklearn.decomposition import PCA
 
-from ..database.weaviate_client import XKCDWeaviateClient
+from ..database.weaviate_client import EMBEDDING_MODEL, XKCDWeaviateClient
 from ..search.query import search_comics
 
 LATENT_DIM_SIZE = 1536  # corresponds to openai small embedding model
+CURSOR_PAGE_SIZE = 100  # comics per page when fetching the vectors
+PCA_DIM_SIZE = 50  # dimensions kept before t-SNE, so its neighbour search doesn't work in the full embedding space
+QUERY_CACHE_FILE = os.path.expanduser(os.path.join("~", "xkcd-comic-finder", "data", "query_embed_cache.npz"))
+# IDs of the comics retrieved per query and search options (delete it after re-populating the database)
+SEARCH_CACHE_FILE = os.path.expanduser(os.path.join("~", "xkcd-comic-finder", "data", "tsne_search_cache.json"))
+
+
+def embed_queries(client_openai, queries, model=EMBEDDING_MODEL, cache_file=QUERY_CACHE_FILE):
+    """
+    Embed query terms, with a single OpenAI request for those not cached on disk by a previous run.
+
+    Args:
+        client_openai: OpenAI client
+        queries: List of query strings
+        model: OpenAI embedding model
+        cache_file: Path of the .npz file caching query embeddings (keyed by a hash of the model and query)
+
+    Returns:
+        Array of shape (len(queries), embedding size), in the order of queries
+    """
+    keys = [hashlib.sha256(f"{model}\0{q}".encode()).hexdigest() for q in queries]
+    cache = dict(np.load(cache_file)) if os.path.exists(cache_file) else {}
+
+    missing = {key: q for key, q in zip(keys, queries) if key not in cache}
+    if missing:
+        response = client_openai.embeddings.create(model=model, input=list(missing.values()))
+        for key, item in zip(missing, response.data):
+            cache[key] = np.asarray(item.embedding, dtype=np.float32)
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        np.savez(cache_file, **cache)
+
+    return np.stack([cache[key] for key in keys])
+
 
 cli = XKCDWeaviateClient()
-_cli = cli.client
 
 max_id = 3001  # Approx. 3k results ATOW
-results = (
-    _cli.query
-    .get("XKCDComic", ["comic_id", "title", "image_url", "explanation", "transcript"])
-    .with_where({
-        "path": ["comic_id"],
-        "operator": "LessThan",
-        "valueInt": max_id
-    })
-    .with_additional(["vector"])
-    .with_limit(max_id)
-    .do()
-)
-results = results.get("data", {}).get("Get", {}).get("XKCDComic", [])
-
-
-
-# Build the matrix of embedding vectors
-X = np.zeros(shape=(3_000, LATENT_DIM_SIZE))
-ids, titles = [], []
-for i, res in enumerate(results):
-    X[i, :] = res['_additional']['vector']
-    ids.append(res['comic_id'])
-    titles.append(res['title'])
+# Page through the collection over gRPC (vectors come as packed floats, rather than JSON text), converting each
+# vector to float32 as it arrives, so the whole result set is never held as Python objects
+collection = cli.client.collections.get("XKCDComic")
+vectors, ids, titles = [], [], []
+for obj in collection.iterator(include_vector=True, return_properties=["comic_id", "title"], cache_size=CURSOR_PAGE_SIZE):
+    if obj.properties["comic_id"] < max_id:
+        vectors.append(np.asarray(obj.vector["default"], dtype=np.float32))
+        ids.append(obj.properties['comic_id'])
+        titles.append(obj.properties['title'])
+
+
+# Build the matrix of embedding vectors (float32 halves the memory, also within t-SNE)
+X = np.stack(vectors) if vectors else np.empty((0, LATENT_DIM_SIZE), dtype=np.float32)
+del vectors
 
 
 # Manually embed various query terms
 queries = ["barrel", "centripetal", "computer programming", "rocket", "USB", "vehicles"]
 client_openai = openai.OpenAI(api_key=os.environ['OPENAI_API_KEY'])
-Q = np.zeros(shape=(len(queries), LATENT_DIM_SIZE))
-for i, q in enumerate(queries):
-    response = client_openai.embeddings.create(
-        model="text-embedding-3-small",
-        input=q
-    )
-    Q[i, :] = response.data[0].embedding
+Q = embed_queries(client_openai, queries)
 
 # Combine / append data sets together (queries last)
-XQ = np.concatenate([X, Q], axis=0)
+XQ = np.empty((len(X) + len(Q), LATENT_DIM_SIZE), dtype=np.float32)
+XQ[:len(X)] = X
+XQ[len(X):] = Q
+# Unit-normalize once, so that (squared) Euclidean distances within t-SNE are equivalent to cosine distances
+XQ /= np.maximum(np.linalg.norm(XQ, axis=1, keepdims=True), np.finfo(np.float32).tiny)
 ids.extend([-1]*len(Q))
 titles.extend(queries)
 
 
-# Perform ANN on our vector DB for each query
-limit = 10
+# Perform ANN on our vector DB for each query (concurrently, as the searches are independent),
+# reusing the query embeddings from above, so that Weaviate doesn't embed the queries again.
+# Results are cached on disk, so re-runs (e.g. to tune t-SNE) only search for new queries / options
+limit, alpha = 10, 0.5
+search_cache = {}
+if os.path.exists(SEARCH_CACHE_FILE):
+    with open(SEARCH_CACHE_FILE, 'rb') as f:
+        search_cache = orjson.loads(f.read())
+cache_keys = [f"{q}|{alpha}|{limit}|{max_id}" for q in queries]
+to_search = [(q, q_vector, key) for q, q_vector, key in zip(queries, Q, cache_keys) if key not in search_cache]
+if to_search:
+    with ThreadPoolExecutor(max_workers=len(to_search)) as executor:
+        retrieved_by_query = list(executor.map(
+            lambda q, q_vector: search_comics(client=cli, query=q, limit=limit, alpha=alpha, max_id=max_id, query_vector=q_vector),
+            [q for q, _, _ in to_search], [q_vector for _, q_vector, _ in to_search]
+        ))
+    for (_, _, key), retrieved in zip(to_search, retrieved_by_query):
+        if retrieved:  # search_comics returns no results on errors, which shouldn't be cached
+            search_cache[key] = [comic['comic_id'] for comic in retrieved]
+    os.makedirs(os.path.dirname(SEARCH_CACHE_FILE), exist_ok=True)
+    with open(SEARCH_CACHE_FILE, 'wb') as f:
+        f.write(orjson.dumps(search_cache))
+
 comic_groups = {}
-for q in queries:
-    retrieved = search_comics(client=cli, query=q, limit=limit, alpha=0.5, max_id=max_id)
-    for comic in retrieved:
-        comic_groups[comic['comic_id']] = q
+for q, key in zip(queries, cache_keys):
+    for comic_id in search_cache.get(key, []):
+        comic_groups[comic_id] = q
 
 
-# t-SNE for dimensionality reduction
-tsne = TSNE(n_components=2, random_state=2025, perplexity=20)  # or 25
-XQ_reduced = tsne.fit_transform(XQ)
+# PCA then (multi-threaded, FFT-accelerated) t-SNE for dimensionality reduction
+XQ_pca = PCA(n_components=PCA_DIM_SIZE, random_state=2025).fit_transform(XQ)
+tsne = TSNE(n_components=2, random_state=2025, perplexity=20, n_jobs=-1)  # or 25
+XQ_reduced = np.asarray(tsne.fit(XQ_pca))
 print(XQ_reduced.shape)
 
 # Create a DataFrame with post-transform 2D coordinates
 df_tsne = pd.DataFrame(XQ_reduced, columns = ['dim1', 'dim2'])
 plot_labels = [comic_groups.get(comic_id, 'other') for comic_id in ids[:-len(queries)]] + titles[-len(queries):]
-alphas = [0.2 if label == 'Other' else 0.9 for label in plot_labels]
 df_tsne['category'] = plot_labels
 df_tsne['title'] = titles
 df_tsne['comic_id'] = ids
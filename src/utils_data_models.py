@@ -19,6 +19,9 @@ from typing import Optional
 @dataclass
 class Comic:
     """Data class representing an XKCD comic."""
+    # Explicit __slots__ (rather than dataclass(slots=True), which needs Python 3.10+): no per-instance __dict__
+    __slots__ = ("comic_id", "title", "image_url", "explanation", "transcript")
+
     comic_id: int
     title: str
     image_url: Optional[str]
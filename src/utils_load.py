@@ -12,59 +12,259 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-import json
 import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
 
 from .utils_data_models import Comic
 
-logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+# numpy is only needed (and imported) for load_comics_columnar
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
+LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # threads reading / parsing files
+LOAD_AHEAD = 4 * LOAD_WORKERS  # files read ahead of the consumer, which bounds the comics held in memory
+
+# All comics of a directory packed into one file, by build_comics_parquet
+COMICS_PARQUET_FILENAME = "comics.parquet"
+COMIC_COLUMNS = ("comic_id", "title", "image_url", "explanation", "transcript")
 
-def load_comics_from_files(comics_dir: Path, comic_ids: List[int] = None) -> list[Comic]:
+
+def load_comics_from_files(comics_dir: Path, comic_ids: List[int] = None) -> Iterator[Comic]:
     """
     Load comics from JSON files in the comics directory.
 
+    Comics are yielded one at a time (in file order), so the full archive never needs to be held in memory.
+    Files are read and parsed on a thread pool, a bounded number ahead of the consumer. When loading all comics,
+    an up-to-date comics.parquet in the directory (see build_comics_parquet) is read instead of the JSON files.
+
     Args:
         comics_dir: Directory containing comic files
         comic_ids: Only load these specific comics files (default: None => load all available)
 
-    Returns:
-        List of Comic objects
+    Yields:
+        Comic objects
     """
-    comics = []
-
     if not comics_dir.exists():
         logger.warning(f"Comics directory {comics_dir} does not exist")
-        return comics
+        return
 
     if comic_ids:
-        comics_to_load = [Path(comics_dir) / f"comic_{comic_id}.json" for comic_id in comic_ids]
+        comics_to_load = [(Path(comics_dir) / f"comic_{comic_id}.json", comic_id) for comic_id in comic_ids]
     else:
-        comics_to_load = comics_dir.glob("comic_*.json")
+        packed_comics = _load_comics_parquet(Path(comics_dir))
+        if packed_comics is not None:
+            yield from packed_comics
+            return
+        comics_to_load = _list_comic_files(comics_dir)
+
+    yield from _load_comic_files(comics_to_load)
+
+
+def build_comics_parquet(comics_dir: Path, out: Optional[Path] = None) -> Path:
+    """
+    Pack the comic JSON files of a directory into a single Parquet file (requires pyarrow).
+
+    load_comics_from_files reads the packed file instead of the JSON files for as long as it is newer than the
+    directory and every comic file in it, i.e. until comic files are added, removed or rewritten.
+
+    Args:
+        comics_dir: Directory containing comic files
+        out: Path of the Parquet file (default: comics.parquet in comics_dir)
+
+    Returns:
+        Path of the Parquet file
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    comics_dir = Path(comics_dir)
+    out = Path(out) if out else comics_dir / COMICS_PARQUET_FILENAME
+
+    columns = _comic_columns(_load_comic_files(_list_comic_files(comics_dir)))
+
+    # Write to a temporary file and swap it in, then make sure it is newer than the directory (which the swap touches)
+    tmp_out = out.with_name(f"{out.name}.tmp")
+    pq.write_table(pa.table(columns), tmp_out, compression='zstd')
+    os.replace(tmp_out, out)
+    os.utime(out)
 
-    for file_path in comics_to_load:
-        try:
-            comic_id = int(file_path.stem.split("_")[1])
+    logger.info(f"Packed {len(columns['comic_id'])} comics into {out}")
+    return out
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                comic_data = json.load(f)
 
-            # Create Comic object from JSON data
-            comic = Comic(
-                comic_id=comic_data.get("comic_id", comic_id),
-                title=comic_data.get("title", "Unknown"),
-                image_url=comic_data.get("image_url") if comic_data.get("image_url") else None,
-                explanation=comic_data.get("explanation", ""),
-                transcript=comic_data.get("transcript", "")
-            )
+def load_comics_columnar(comics_dir: Path, comic_ids: List[int] = None) -> Dict[str, "np.ndarray"]:
+    """
+    Load comics as columns (one array per Comic field), e.g. to feed whole columns into batched embedding requests.
+
+    Args:
+        comics_dir: Directory containing comic files
+        comic_ids: Only load these specific comics files (default: None => load all available)
+
+    Returns:
+        Dict of Comic field name to array: int32 for comic_id, object (str / None) for the others
+    """
+    import numpy as np
+
+    columns = _comic_columns(load_comics_from_files(comics_dir, comic_ids))
+    return {
+        column: np.array(values, dtype=np.int32 if column == "comic_id" else object)
+        for column, values in columns.items()
+    }
+
+
+def _comic_columns(comics: Iterable[Comic]) -> Dict[str, list]:
+    """Transpose comics into a list of values per Comic field."""
+    columns = {column: [] for column in COMIC_COLUMNS}
+    for comic in comics:
+        for column in COMIC_COLUMNS:
+            columns[column].append(getattr(comic, column))
+    return columns
+
+
+def _load_comics_parquet(comics_dir: Path) -> Optional[Iterator[Comic]]:
+    """
+    Get the comics packed in the directory's comics.parquet, if there is one and it is up to date.
+
+    Args:
+        comics_dir: Directory containing comic files
+
+    Returns:
+        Iterator over the packed comics, or None if the JSON files need to be read
+    """
+    parquet_path = comics_dir / COMICS_PARQUET_FILENAME
+    try:
+        if parquet_path.stat().st_mtime_ns < _latest_mtime_ns(comics_dir):
+            logger.info(f"Ignoring {parquet_path}: comic files have been added, removed or rewritten since it was built")
+            return None
+    except FileNotFoundError:
+        return None
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        logger.warning(f"Ignoring {parquet_path}: pyarrow is not installed")
+        return None
+
+    return _iter_parquet_comics(pq.ParquetFile(parquet_path))
+
+
+def _latest_mtime_ns(comics_dir: Path) -> int:
+    """
+    Get the latest modification time of a directory and the comic files in it.
+
+    The directory's own mtime covers files being added or removed, but a file rewritten in place only updates its own.
+
+    Args:
+        comics_dir: Directory containing comic files
+
+    Returns:
+        The latest mtime, in nanoseconds
+    """
+    latest = comics_dir.stat().st_mtime_ns
+    with os.scandir(comics_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith("comic_") and name.endswith(".json"):
+                latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
+
+
+def _iter_parquet_comics(parquet_file) -> Iterator[Comic]:
+    """Yield the comics of a Parquet file, one record batch in memory at a time."""
+    for batch in parquet_file.iter_batches(columns=list(COMIC_COLUMNS)):
+        for row in batch.to_pylist():
+            yield Comic(**row)
+
+
+def _load_comic_files(comics_to_load: List[Tuple[Path, int]]) -> Iterator[Comic]:
+    """
+    Load comics from their JSON files, in order.
+
+    Args:
+        comics_to_load: List of (path, comic ID) of the files to load
+
+    Yields:
+        Comic objects (files that can't be loaded are skipped)
+    """
+    # Not worth starting threads for a single file (e.g. the scraper checking one saved comic)
+    if len(comics_to_load) < 2:
+        for file_path, comic_id in comics_to_load:
+            comic = _load_comic_file(file_path, comic_id)
+            if comic:
+                yield comic
+        return
+
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        pending = deque()
+        for file_path, comic_id in comics_to_load:
+            pending.append(executor.submit(_load_comic_file, file_path, comic_id))
+            if len(pending) >= LOAD_AHEAD:
+                comic = pending.popleft().result()
+                if comic:
+                    yield comic
+
+        while pending:
+            comic = pending.popleft().result()
+            if comic:
+                yield comic
+
+
+def _list_comic_files(comics_dir: Path) -> List[Tuple[Path, int]]:
+    """
+    List the comic files in a directory, with one scandir pass (file names carry the comic IDs, so no stat is needed).
+
+    Args:
+        comics_dir: Directory containing comic files
+
+    Returns:
+        List of (path, comic ID) of the comic_<id>.json files
+    """
+    comic_files = []
+    with os.scandir(comics_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith("comic_") and name.endswith(".json"):
+                try:
+                    comic_files.append((Path(entry.path), int(name[6:-5])))
+                except ValueError:
+                    logger.error(f"Error loading comic from {entry.path}: no comic ID in the file name")
+    return comic_files
+
+
+def _load_comic_file(file_path: Path, comic_id: int) -> Optional[Comic]:
+    """
+    Load a comic from its JSON file.
+
+    Args:
+        file_path: Path of the comic_<id>.json file
+        comic_id: ID of the comic (used if the file doesn't have one)
+
+    Returns:
+        Comic object, or None if the file couldn't be loaded
+    """
+    try:
+        comic_data = orjson.loads(file_path.read_bytes())
 
-            comics.append(comic)
-            logger.debug(f"Loaded comic {comic_id} from JSON file")
+        # Create Comic object from JSON data
+        comic = Comic(
+            comic_id=comic_data.get("comic_id", comic_id),
+            title=comic_data.get("title", "Unknown"),
+            image_url=comic_data.get("image_url") if comic_data.get("image_url") else None,
+            explanation=comic_data.get("explanation", ""),
+            transcript=comic_data.get("transcript", "")
+        )
 
-        except Exception as e:
-            logger.error(f"Error loading comic from {file_path}: {str(e)}")
+        logger.debug("Loaded comic %d from JSON file", comic_id)
+        return comic
 
-    return comics
+    except Exception as e:
+        logger.error(f"Error loading comic from {file_path}: {str(e)}")
+        return None
@@ -0,0 +1,318 @@
+#  Copyright (C) 2025 lukerm of www.zl-labs.tech
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Shared fixtures for the XKCD comic finder tests.
+
+HTTP requests are intercepted with the responses library, which serves the HTML fixture files (and generic pages
+for any other comics) to the scraper's requests session. The fixture files are read-only, so they (and the
+callbacks serving them) are built once per test session. S3 is replaced by a stub client serving comics from memory.
+"""
+import functools
+import io
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+import orjson
+import pytest
+import responses
+from botocore.exceptions import ClientError
+
+from src.scraper.scraper import XKCDScraper, _parse_page
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+
+# Sample error HTML to test error handling
+ERROR_HTML = """
+<html>
+<body>
+<h1>Error: Page not found</h1>
+<p>The requested comic does not exist.</p>
+</body>
+</html>
+"""
+
+# Any URL: every request goes through the page callback, which decides what to serve
+ANY_URL = re.compile(r'.*')
+
+# Site ("explain" or "xkcd") and comic ID of a requested page, e.g. https://xkcd.com/500/
+URL_RE = re.compile(r'://[^/]*?(explain|xkcd)[^/]*/(?:[^?#]*/)?(\d+)/?$')
+
+# Comic ID of a requested S3 key, e.g. xkcd/comics/comic_500.json
+S3_KEY_RE = re.compile(r'comic_(\d+)\.json$')
+
+# Responses (status, headers, body) for comic IDs that simulate errors, whichever site is requested
+ERROR_RESPONSES = {
+    '404': (404, {}, ERROR_HTML),
+    '999': (500, {}, ""),
+}
+NOT_FOUND_RESPONSE = (404, {}, "Not found")
+
+@functools.lru_cache(maxsize=128)
+def _generic_explain_response(comic_id):
+    """Generic explainxkcd.com page for a comic without a fixture."""
+    return (200, {}, f'<html><body><h1>{comic_id}: Generic Comic</h1><h2><span id="Explanation">Explanation</span></h2><p>Generic explanation for comic {comic_id}.</p><h2><span id="Transcript">Transcript</span></h2><p>Generic transcript.</p></body></html>')
+
+@functools.lru_cache(maxsize=128)
+def _generic_xkcd_response(comic_id):
+    """Generic xkcd.com page (with a per-comic image URL) for a comic without a fixture."""
+    return (200, {}, f'<html><body><div id="comic"><img src="//imgs.xkcd.com/comics/comic_{comic_id}.png" alt="Comic {comic_id}"/></div></body></html>')
+
+# Simple xkcd.com pages with just the comic image, for comics whose explainxkcd.com pages are fixtures
+SIMPLE_XKCD_PAGES = {
+    ('xkcd', '500'): '<html><body><div id="comic"><img src="//imgs.xkcd.com/comics/election.png" alt="Election"/></div></body></html>',
+    ('xkcd', '505'): '<html><body><div id="comic"><img src="//imgs.xkcd.com/comics/rocks.png" alt="A Bunch of Rocks"/></div></body></html>',
+    ('xkcd', '600'): '<html><body><div id="comic"><img src="//imgs.xkcd.com/comics/android.png" alt="Android Boyfriend"/></div></body></html>',
+}
+
+def make_page_callback(pages):
+    """
+    Create a responses callback that returns the given pages, and generic pages for any other comics.
+
+    Args:
+        pages: HTML content (str or UTF-8 bytes) of the pages to serve, keyed by (site, comic_id),
+            where site is "explain" or "xkcd" and comic_id is a string, e.g. ('xkcd', '500')
+
+    Returns:
+        function: Callback for responses.RequestsMock.add_callback
+    """
+    pages = {key: (200, {}, html) for key, html in pages.items()}
+
+    def page_callback(request):
+        match = URL_RE.search(request.url)
+        if match is None:
+            return NOT_FOUND_RESPONSE
+        site, comic_id = match.groups()
+        # Handle error cases FIRST (before generic fallbacks)
+        if comic_id in ERROR_RESPONSES:
+            return ERROR_RESPONSES[comic_id]
+        page = pages.get((site, comic_id))
+        if page is not None:
+            return page
+        # Handle any other requests (generic fallbacks)
+        if site == 'explain':
+            return _generic_explain_response(comic_id)
+        return _generic_xkcd_response(comic_id)
+
+    return page_callback
+
+def _serve_pages(page_callback):
+    """
+    Intercept all requests made with the requests library, answering them with page_callback.
+
+    Yields:
+        responses.RequestsMock: The active mock (e.g. for inspecting the requests made)
+    """
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as mock:
+        mock.add_callback(responses.GET, ANY_URL, callback=page_callback, content_type='text/html')
+        yield mock
+
+class StubS3Client:
+    """
+    Stand-in for the scraper's boto3 S3 client, serving comics from a dict.
+
+    Attributes:
+        comics: Comic data (as saved in the bucket) keyed by comic ID
+        requested_ids: IDs of the comics requested with get_object, in order
+        list_requests: Number of bucket listings made
+    """
+
+    def __init__(self):
+        self.comics = {}
+        self.requested_ids = []
+        self.list_requests = 0
+        self._lock = threading.Lock()  # get_object is called from the scraper's worker threads
+
+    def add_comics(self, comic_ids):
+        """Put generic comics with the given IDs in the bucket."""
+        for comic_id in comic_ids:
+            self.comics[comic_id] = {
+                "comic_id": comic_id, "title": f"Comic {comic_id}", "image_url": "",
+                "explanation": f"Explanation for comic {comic_id}.", "transcript": "",
+            }
+
+    def get_object(self, Bucket, Key):
+        comic_id = int(S3_KEY_RE.search(Key).group(1))
+        with self._lock:
+            self.requested_ids.append(comic_id)
+        if comic_id not in self.comics:
+            raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not found'}}, 'GetObject')
+        return {'Body': io.BytesIO(orjson.dumps(self.comics[comic_id]))}
+
+    def get_paginator(self, operation_name):
+        assert operation_name == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        self.list_requests += 1
+        yield {'Contents': [{'Key': f"{Prefix}{comic_id}.json"} for comic_id in sorted(self.comics)]}
+
+def _read_fixture(site, filename):
+    """
+    Read an HTML fixture file.
+
+    Args:
+        site: Site the page was saved from (subdirectory of the fixtures directory)
+        filename: Name of the fixture file
+
+    Returns:
+        bytes: Raw (UTF-8) HTML content of the fixture file, as served to the scraper
+    """
+    with open(FIXTURES_DIR / site / filename, 'rb') as f:
+        return f.read()
+
+@pytest.fixture(scope="module")
+def scraper():
+    """
+    Fixture to create a scraper instance shared by the tests in a module.
+
+    The requests are mocked, so there is no delay between them: the per-host request timings then
+    never hold up a later test, and scrape_comic leaves no other state behind.
+
+    Returns:
+        XKCDScraper: A scraper instance
+    """
+    with XKCDScraper(min_delay=0.0, max_delay=0.0) as shared_scraper:
+        yield shared_scraper
+
+@pytest.fixture
+def s3_scraper(tmp_path):
+    """
+    Fixture to create a scraper that saves to a fresh directory, with a stub S3 client (initially empty).
+
+    Returns:
+        tuple: The scraper and its StubS3Client
+    """
+    s3_client = StubS3Client()
+    with XKCDScraper(min_delay=0.0, max_delay=0.0, output_dir=tmp_path, max_workers=2) as s3_scraper:
+        s3_scraper._s3_client = s3_client
+        yield s3_scraper, s3_client
+
+@pytest.fixture(scope="module")
+def test_output_dir():
+    """
+    Fixture to create a temporary test output directory, shared by the tests in a module.
+
+    Tests must write uniquely named files there, so that they don't see each other's output.
+
+    Returns:
+        Path: Path to the temporary test output directory
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir)
+        yield output_dir
+        # No manual cleanup needed - the context manager will handle it
+
+@pytest.fixture(scope="session")
+def explainxkcd_comic_500_html():
+    """
+    Fixture to load the explainxkcd.com HTML content for comic 500.
+
+    Returns:
+        bytes: HTML content from the explainxkcd.com comic 500 fixture file
+    """
+    return _read_fixture("explainxkcd.com", "comic_500.html")
+
+@pytest.fixture(scope="session")
+def explainxkcd_comic_505_html():
+    """
+    Fixture to load the explainxkcd.com HTML content for comic 505.
+
+    Returns:
+        bytes: HTML content from the explainxkcd.com comic 505 fixture file
+    """
+    return _read_fixture("explainxkcd.com", "comic_505.html")
+
+@pytest.fixture(scope="session")
+def explainxkcd_comic_600_html():
+    """
+    Fixture to load the explainxkcd.com HTML content for comic 600.
+
+    Returns:
+        bytes: HTML content from the explainxkcd.com comic 600 fixture file
+    """
+    return _read_fixture("explainxkcd.com", "comic_600.html")
+
+@pytest.fixture(scope="session")
+def xkcd_comic_500_html():
+    """
+    Fixture to load the actual xkcd.com HTML content from file.
+
+    Returns:
+        bytes: HTML content from the xkcd.com comic 500 fixture file
+    """
+    return _read_fixture("xkcd.com", "comic_500.html")
+
+@pytest.fixture(scope="session")
+def explainxkcd_pages(explainxkcd_comic_500_html, explainxkcd_comic_505_html, explainxkcd_comic_600_html):
+    """
+    Fixture for the explainxkcd.com fixtures, parsed once for the tests that only extract from them.
+
+    Returns:
+        dict: Parsed page (lxml root element) of each fixture, keyed by comic ID
+    """
+    return {
+        500: _parse_page(explainxkcd_comic_500_html),
+        505: _parse_page(explainxkcd_comic_505_html),
+        600: _parse_page(explainxkcd_comic_600_html),
+    }
+
+@pytest.fixture(scope="session")
+def page_callback(explainxkcd_comic_500_html, explainxkcd_comic_505_html, explainxkcd_comic_600_html):
+    """
+    Fixture for a callback serving the explainxkcd.com fixtures.
+
+    Returns:
+        function: Callback for responses.RequestsMock.add_callback
+    """
+    return make_page_callback({
+        ('explain', '500'): explainxkcd_comic_500_html,
+        ('explain', '505'): explainxkcd_comic_505_html,
+        ('explain', '600'): explainxkcd_comic_600_html,
+        **SIMPLE_XKCD_PAGES,
+    })
+
+@pytest.fixture(scope="session")
+def page_callback_with_xkcd_page(xkcd_comic_500_html, explainxkcd_comic_500_html):
+    """
+    Fixture for a callback serving the xkcd.com and explainxkcd.com fixtures for comic 500.
+
+    Returns:
+        function: Callback for responses.RequestsMock.add_callback
+    """
+    return make_page_callback({
+        ('xkcd', '500'): xkcd_comic_500_html,
+        ('explain', '500'): explainxkcd_comic_500_html,
+    })
+
+@pytest.fixture
+def mock_pages(page_callback):
+    """
+    Fixture serving the explainxkcd.com fixtures to all requests made during the test.
+
+    Yields:
+        responses.RequestsMock: The active mock
+    """
+    yield from _serve_pages(page_callback)
+
+@pytest.fixture
+def mock_pages_with_xkcd_page(page_callback_with_xkcd_page):
+    """
+    Fixture serving the xkcd.com and explainxkcd.com fixtures for comic 500 to all requests made during the test.
+
+    Yields:
+        responses.RequestsMock: The active mock
+    """
+    yield from _serve_pages(page_callback_with_xkcd_page)
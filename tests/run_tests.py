@@ -20,9 +20,87 @@ way to run the entire test suite with coverage reporting.
 """
 import sys
 import os
+import shlex
 import subprocess
 import argparse
-import tempfile
+from importlib.util import find_spec
+
+
+def _num_workers():
+    """Number of pytest-xdist workers, leaving a couple of cores free for the OS."""
+    return max(1, (os.cpu_count() or 2) - 2)
+
+def _collect_test_files(config_path, marker=None):
+    """
+    Collect the test files that pytest would run.
+
+    Args:
+        config_path: Path to the pytest.ini to use
+        marker: Optional marker expression to filter tests by
+
+    Returns:
+        List of test file paths, in collection order (empty if no tests match)
+    """
+    # Override the ini's addopts (e.g. -v), so that -q reliably prints one path::test node ID per line
+    cmd = ['pytest', '-c', config_path, '-o', 'addopts=--import-mode=importlib', '--collect-only', '-q']
+    if marker:
+        cmd.extend(['-m', marker])
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode == 5:  # no tests collected
+        return []
+
+    # Node IDs are reported relative to the rootdir (the directory of pytest.ini)
+    root_dir = os.path.dirname(config_path)
+    files = []
+    for line in result.stdout.splitlines():
+        if '::' in line:
+            path = os.path.join(root_dir, line.split('::', 1)[0])
+            if path not in files:
+                files.append(path)
+
+    if result.returncode != 0 or not files:
+        sys.exit(f"Could not collect the test files to shard (pytest exit code {result.returncode}):\n"
+                 f"{result.stdout}{result.stderr}")
+    return files
+
+
+def _run_sharded(cmd, files, coverage_args):
+    """
+    Run the test files in parallel pytest processes, one per shard, then combine coverage.
+
+    Args:
+        cmd: Base pytest command (without test paths or coverage options)
+        files: Test files to distribute round-robin across the shards
+        coverage_args: pytest-cov report options for the combined report (None => no coverage)
+
+    Returns:
+        Non-zero if any shard (or the coverage report) failed
+    """
+    num_shards = min(_num_workers(), len(files))
+    shards = [files[i::num_shards] for i in range(num_shards)]
+
+    processes = []
+    for i, shard in enumerate(shards):
+        shard_cmd = cmd + shard
+        env = dict(os.environ)
+        if coverage_args is not None:
+            # Each shard writes its own data file; reports are only produced once everything is combined
+            shard_cmd += ['--cov=src', '--cov-report=']
+            env['COVERAGE_FILE'] = f'.coverage.shard{i}'
+        print(f"Running shard {i + 1}/{num_shards}: {shlex.join(shard_cmd)}")
+        processes.append(subprocess.Popen(shard_cmd, env=env))
+
+    returncode = 0
+    for process in processes:
+        returncode = process.wait() or returncode
+
+    if coverage_args is not None:
+        subprocess.run([sys.executable, '-m', 'coverage', 'combine'])
+        for report_args in coverage_args:
+            returncode = subprocess.run([sys.executable, '-m', 'coverage', *report_args]).returncode or returncode
+
+    return returncode
+
 
 def main():
     """Run the test suite with appropriate options."""
@@ -35,14 +113,34 @@ def main():
     parser.add_argument('--no-coverage', action='store_true',
                         help='Disable coverage reporting')
     parser.add_argument('-m', '--marker', type=str,
-                        help='Only run tests with specific marker (parse, storage, error)')
+                        help='Only run tests with specific marker (parse, storage, network, database, search, error)')
     parser.add_argument('--save-coverage', action='store_true',
                         help='Save coverage report to permanent location (test_output/coverage_html)')
+    parser.add_argument('--cov-context', action='store_true',
+                        help='Record which tests cover each line in the saved HTML report (slows down the run)')
+    parser.add_argument('--cov-report-xml', action='store_true',
+                        help='Write an XML coverage report for CI (test_output/coverage.xml)')
+    parser.add_argument('--fast-coverage', action='store_true',
+                        help='Measure coverage with SlipCover instead of pytest-cov (also enabled by SLIPCOVER=1)')
+    parser.add_argument('--no-parallel', action='store_true',
+                        help='Run tests serially (disable pytest-xdist)')
+    parser.add_argument('--shard', action='store_true',
+                        help='Split the test files across separate pytest processes instead of using pytest-xdist')
 
     args = parser.parse_args()
 
+    # SlipCover has far lower overhead than coverage.py, but the HTML report still needs pytest-cov
+    fast_coverage = (args.fast_coverage or os.environ.get('SLIPCOVER') == '1') and not args.save_coverage and not args.shard
+
     # Build pytest command
-    cmd = ['pytest']
+    if args.no_coverage or not fast_coverage:
+        cmd = ['pytest']
+    else:
+        cmd = [sys.executable, '-m', 'slipcover', '--source', 'src']
+        if args.cov_report_xml:
+            os.makedirs('test_output', exist_ok=True)
+            cmd.extend(['--xml', '--out', os.path.join('test_output', 'coverage.xml')])
+        cmd.extend(['-m', 'pytest'])
     # bespoke configuration (as pytest.ini is under tests/):
     config_path = os.path.join(os.path.dirname(__file__), 'pytest.ini')
     cmd.extend(['-c', config_path])
@@ -57,30 +155,55 @@ def main():
 
     # Add marker if specified
     if args.marker:
-        cmd.append(f'-m {args.marker}')
+        cmd.extend(['-m', args.marker])
+
+    if args.shard:
+        files = _collect_test_files(config_path, args.marker)
+        if not files:
+            print("No tests collected.")
+            sys.exit(5)
 
-    # Add coverage if not disabled
-    if not args.no_coverage:
+        coverage_args = None
+        if not args.no_coverage:
+            coverage_args = [['report', '--show-missing', '--skip-covered']]
+            if args.save_coverage:
+                coverage_args.append(['html', '-d', os.path.join('test_output', 'coverage_html')])
+            if args.cov_report_xml:
+                coverage_args.append(['xml', '-o', os.path.join('test_output', 'coverage.xml')])
+
+        sys.exit(_run_sharded(cmd, files, coverage_args))
+
+    # Distribute tests across workers if pytest-xdist is available
+    # (test by test: the fixtures shared within a file are read-only or cheap to build, so each worker builds its own)
+    if not args.no_parallel:
+        if find_spec('xdist') is not None:
+            cmd.extend(['-n', str(_num_workers()), '--dist=load'])
+        else:
+            print("pytest-xdist not installed: running tests serially.")
+
+    # Add coverage if not disabled (and not already handled by SlipCover)
+    if not args.no_coverage and not fast_coverage:
         cmd.append('--cov=src')
-        cmd.append('--cov-report=term')
+        # Only list files that aren't fully covered (with their missing lines) to keep the summary short
+        cmd.append('--cov-report=term-missing:skip-covered')
 
-        # Use temp directory for coverage reports unless --save-coverage is specified
+        # Only render the (slow) HTML report when it is explicitly requested
         if args.save_coverage:
             html_dir = os.path.join('test_output', 'coverage_html')
             os.makedirs(html_dir, exist_ok=True)
             cmd.append(f'--cov-report=html:{html_dir}')
-        else:
-            # Create temporary directory for coverage reports
-            temp_dir = tempfile.mkdtemp(prefix='xkcd_coverage_')
-            cmd.append(f'--cov-report=html:{temp_dir}')
-            print(f"Coverage report will be generated in temporary directory: {temp_dir}")
-            print("This directory will be deleted when the process exits.")
+            if args.cov_context:
+                cmd.append('--cov-context=test')
+
+        if args.cov_report_xml:
+            os.makedirs('test_output', exist_ok=True)
+            cmd.append(f"--cov-report=xml:{os.path.join('test_output', 'coverage.xml')}")
 
     # Print the command being run
-    print(f"Running: {' '.join(cmd)}")
+    print(f"Running: {shlex.join(cmd)}")
 
     # Execute pytest
-    result = subprocess.run(' '.join(cmd), shell=True)
+    result = subprocess.run(cmd)
 
     # Return non-zero exit code if tests failed
     sys.exit(result.returncode)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+#  Copyright (C) 2025 lukerm of www.zl-labs.tech
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Tests for the on-disk cache of comic embeddings.
+
+The Weaviate collection is replaced by a stub serving hand-made vectors, so no database
+(or OpenAI) connection is needed.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from weaviate.util import generate_uuid5
+
+from src.database.embeddings_cache import EmbeddingsCache
+from src.utils_data_models import Comic
+
+LATENT_DIM_SIZE = 8
+
+
+def _vector(seed):
+    """A reproducible random vector, normalized like the OpenAI embeddings."""
+    vector = np.random.default_rng(seed).normal(size=LATENT_DIM_SIZE).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _comic(comic_id, explanation="Explanation"):
+    """A comic with the given explanation."""
+    return Comic(comic_id=comic_id, title=f"Comic {comic_id}", image_url=None, explanation=explanation, transcript="")
+
+
+def _add(cache, comic):
+    """Cache a reproducible vector for a comic's current text."""
+    cache.add(comic.comic_id, EmbeddingsCache.text_hash(comic.title, comic.explanation, comic.transcript), _vector(comic.comic_id))
+
+
+class StubCollection:
+    """Serves the comics' vectors by UUID, like collection.query.fetch_objects_by_ids."""
+
+    def __init__(self, comics):
+        self.objects = {
+            generate_uuid5(comic.comic_id): SimpleNamespace(
+                properties={"comic_id": comic.comic_id, "title": comic.title, "explanation": comic.explanation, "transcript": comic.transcript},
+                vector={"default": _vector(comic.comic_id).tolist()},
+            )
+            for comic in comics
+        }
+        self.requested = []
+        self.query = SimpleNamespace(fetch_objects_by_ids=self._fetch_objects_by_ids)
+
+    def _fetch_objects_by_ids(self, ids, **kwargs):
+        self.requested.extend(ids)
+        return SimpleNamespace(objects=[self.objects[uuid] for uuid in ids if uuid in self.objects])
+
+
+@pytest.mark.storage
+def test_quantize_round_trip():
+    """Int8 quantization should keep every component within half a quantization step."""
+    vector = _vector(0)
+    quantized, scale = EmbeddingsCache._quantize(vector)
+
+    assert quantized.dtype == np.int8
+    assert np.abs(quantized.astype(np.float32) * scale - vector).max() <= scale / 2 + 1e-7
+
+
+@pytest.mark.storage
+def test_add_and_get(tmp_path):
+    """Added vectors should be found by comic, and only for the text they were computed for."""
+    cache = EmbeddingsCache(tmp_path / "embeddings.npy")
+    _add(cache, _comic(500))
+
+    assert 500 in cache and 505 not in cache
+    assert cache.get(_comic(505)) is None
+    np.testing.assert_allclose(cache.get(_comic(500)), _vector(500), atol=0.01)
+
+    # An updated explanation needs a new vector
+    assert cache.get(_comic(500, explanation="Updated explanation")) is None
+
+
+@pytest.mark.storage
+def test_save_and_reload(tmp_path):
+    """Saved vectors should be memory-mapped on reload, and replaced or appended to by later saves."""
+    path = tmp_path / "embeddings.npy"
+    cache = EmbeddingsCache(path)
+    _add(cache, _comic(500))
+    _add(cache, _comic(505))
+    cache.save()
+
+    reloaded = EmbeddingsCache(path)
+    assert isinstance(reloaded._vectors, np.memmap)
+    assert reloaded.get(_comic(505)) == cache.get(_comic(505))
+
+    updated = _comic(500, explanation="Updated explanation")
+    _add(reloaded, updated)
+    _add(reloaded, _comic(600))
+    reloaded.save()
+
+    reloaded = EmbeddingsCache(path)
+    assert len(reloaded._index) == 3
+    assert reloaded.get(_comic(500)) is None
+    assert reloaded.get(updated) is not None
+    np.testing.assert_allclose(reloaded.get(_comic(600)), _vector(600), atol=0.01)
+
+
+@pytest.mark.storage
+def test_fetch_vectors(tmp_path):
+    """Vectors read back from the collection should be cached for the text stored with them."""
+    comics = [_comic(comic_id) for comic_id in (500, 505, 600)]
+    collection = StubCollection(comics)
+    cache = EmbeddingsCache(tmp_path / "embeddings.npy")
+
+    cache.fetch_vectors(collection, [505, 600], chunk_size=1)
+
+    assert collection.requested == [generate_uuid5(505), generate_uuid5(600)]
+    assert cache.get(comics[0]) is None
+    np.testing.assert_allclose(cache.get(comics[2]), _vector(600), atol=0.01)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+#  Copyright (C) 2025 lukerm of www.zl-labs.tech
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Tests for the semantic cache of search results.
+
+Query embeddings are made by hand (and normalized with SemCache.normalize), so no OpenAI request is made.
+"""
+import pytest
+
+from src.search.semcache import SemCache
+
+PARAMS = (5, 0.5)  # e.g. (limit, alpha)
+RESULTS = [{"comic_id": 500, "title": "Election"}]
+
+
+def _query(*components):
+    """A normalized query embedding."""
+    return SemCache.normalize(components)
+
+
+@pytest.mark.search
+def test_similarity_threshold():
+    """Queries at least as similar as the threshold should hit, less similar ones should miss."""
+    cache = SemCache(threshold=0.95)
+    cache.put(_query(1.0, 0.0, 0.0), PARAMS, RESULTS)
+
+    # cos = 0.995 and 0.707 respectively
+    assert cache.get(_query(1.0, 0.1, 0.0), PARAMS) == RESULTS
+    assert cache.get(_query(1.0, 1.0, 0.0), PARAMS) is None
+
+
+@pytest.mark.search
+def test_params_must_match():
+    """The same query with other search parameters should miss, and be cached separately."""
+    cache = SemCache()
+    cache.put(_query(1.0, 0.0, 0.0), PARAMS, RESULTS)
+    assert cache.get(_query(1.0, 0.0, 0.0), (10, 0.5)) is None
+
+    other_results = [{"comic_id": 505, "title": "A Bunch of Rocks"}]
+    cache.put(_query(1.0, 0.0, 0.0), (10, 0.5), other_results)
+    assert cache.get(_query(1.0, 0.0, 0.0), PARAMS) == RESULTS
+    assert cache.get(_query(1.0, 0.0, 0.0), (10, 0.5)) == other_results
+
+
+@pytest.mark.search
+def test_results_are_copies():
+    """Modifying returned (or put) results should not change the cached ones."""
+    cache = SemCache()
+    results = [dict(result) for result in RESULTS]
+    cache.put(_query(1.0, 0.0, 0.0), PARAMS, results)
+    results[0]["title"] = "Changed"
+    cache.get(_query(1.0, 0.0, 0.0), PARAMS)[0]["title"] = "Changed"
+
+    assert cache.get(_query(1.0, 0.0, 0.0), PARAMS) == RESULTS
+
+
+@pytest.mark.search
+def test_least_recently_used_overwritten():
+    """When full, the least recently used entry (counting hits as uses) should be overwritten."""
+    cache = SemCache(capacity=2)
+    queries = [_query(1.0, 0.0, 0.0), _query(0.0, 1.0, 0.0), _query(0.0, 0.0, 1.0)]
+    cache.put(queries[0], PARAMS, [{"comic_id": 0}])
+    cache.put(queries[1], PARAMS, [{"comic_id": 1}])
+
+    # Using the first entry makes the second one the least recently used
+    assert cache.get(queries[0], PARAMS) == [{"comic_id": 0}]
+    cache.put(queries[2], PARAMS, [{"comic_id": 2}])
+
+    assert len(cache) == 2
+    assert cache.get(queries[0], PARAMS) == [{"comic_id": 0}]
+    assert cache.get(queries[1], PARAMS) is None
+    assert cache.get(queries[2], PARAMS) == [{"comic_id": 2}]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+#  Copyright (C) 2025 lukerm of www.zl-labs.tech
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Tests for loading saved comics, from their JSON files or the packed comics.parquet.
+"""
+import os
+
+import orjson
+import pytest
+
+from src import utils_load
+from src.utils_load import build_comics_parquet, load_comics_columnar, load_comics_from_files
+
+
+def _write_comic(comics_dir, comic_id, title):
+    """Write a comic_<id>.json file, like the scraper saves."""
+    comic = {"comic_id": comic_id, "title": title, "image_url": "", "explanation": "Explanation", "transcript": ""}
+    (comics_dir / f"comic_{comic_id}.json").write_bytes(orjson.dumps(comic))
+
+
+@pytest.mark.storage
+def test_parquet_ignored_after_comic_rewritten(tmp_path):
+    """
+    Test that a comic file rewritten in place invalidates the packed comics.parquet
+
+    Rewriting a file doesn't touch the directory's mtime, so the loader has to
+    compare against the mtimes of the comic files themselves.
+    """
+    pytest.importorskip("pyarrow")
+
+    for comic_id in (500, 505):
+        _write_comic(tmp_path, comic_id, f"Title {comic_id}")
+    parquet_mtime_ns = build_comics_parquet(tmp_path).stat().st_mtime_ns
+    dir_mtime_ns = tmp_path.stat().st_mtime_ns
+
+    # Rewrite a comic, backdating it: the (up to date) parquet file is still served
+    _write_comic(tmp_path, 505, "New title")
+    os.utime(tmp_path / "comic_505.json", ns=(parquet_mtime_ns - 10**9, parquet_mtime_ns - 10**9))
+    assert tmp_path.stat().st_mtime_ns == dir_mtime_ns
+    assert {comic.comic_id: comic.title for comic in load_comics_from_files(tmp_path)}[505] == "Title 505"
+
+    # Once the rewritten file is newer than the parquet file, the JSON files are read instead
+    os.utime(tmp_path / "comic_505.json", ns=(parquet_mtime_ns + 10**9, parquet_mtime_ns + 10**9))
+    assert {comic.comic_id: comic.title for comic in load_comics_from_files(tmp_path)}[505] == "New title"
+
+
+@pytest.mark.storage
+def test_load_comics_columnar(tmp_path):
+    """
+    Test loading comics as column arrays, all of them or by ID
+
+    Verifies the dtypes of the arrays (int32 IDs, object text columns with None for
+    missing image URLs) and that only the requested comics are loaded, in order.
+    numpy must not become a module-level import of utils_load.
+    """
+    np = pytest.importorskip("numpy")
+
+    for comic_id in (500, 505, 600):
+        _write_comic(tmp_path, comic_id, f"Title {comic_id}")
+
+    columns = load_comics_columnar(tmp_path)
+    assert set(columns) == {"comic_id", "title", "image_url", "explanation", "transcript"}
+    assert columns["comic_id"].dtype == np.int32
+    assert sorted(columns["comic_id"].tolist()) == [500, 505, 600]
+    assert columns["title"].dtype == object
+    assert columns["image_url"].tolist() == [None, None, None]
+
+    columns = load_comics_columnar(tmp_path, comic_ids=[600, 500])
+    assert columns["comic_id"].tolist() == [600, 500]
+    assert columns["title"].tolist() == ["Title 600", "Title 500"]
+
+    # numpy is only imported within the function, so the other loaders don't need it
+    assert not hasattr(utils_load, "np")
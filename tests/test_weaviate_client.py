@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#  Copyright (C) 2025 lukerm of www.zl-labs.tech
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Tests for the Weaviate client wrapper.
+
+The weaviate client is replaced by a stub, so no Weaviate instance is needed.
+"""
+import logging
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.database.weaviate_client import XKCDWeaviateClient
+from src.utils_data_models import Comic
+
+
+class StubWeaviateClient:
+    """
+    Stand-in for weaviate.WeaviateClient, answering the requests made by get_database_info.
+
+    Attributes:
+        calls: Names of the requests made, in the order they were answered
+        count_error: Exception raised by the comic count aggregation (if any)
+    """
+
+    def __init__(self, comic_count=42, count_error=None):
+        self.calls = []
+        self.count_error = count_error
+        self._comic_count = comic_count
+        self._lock = threading.Lock()  # the requests are made from get_database_info's worker threads
+        self.collections = SimpleNamespace(list_all=self._list_all, get=self._get_collection)
+
+    def _record(self, name):
+        with self._lock:
+            self.calls.append(name)
+
+    def is_connected(self):
+        return True
+
+    def is_ready(self):
+        self._record("is_ready")
+        return True
+
+    def get_meta(self):
+        self._record("get_meta")
+        return {"version": "1.30.11"}
+
+    def _list_all(self):
+        self._record("list_all")
+        return {"XKCDComic": None}
+
+    def _get_collection(self, name):
+        return SimpleNamespace(aggregate=SimpleNamespace(over_all=self._over_all))
+
+    def _over_all(self, total_count):
+        self._record("over_all")
+        if self.count_error is not None:
+            raise self.count_error
+        return SimpleNamespace(total_count=self._comic_count)
+
+
+def _client_with(stub):
+    """An XKCDWeaviateClient using the stub instead of a connection."""
+    client = XKCDWeaviateClient()
+    client._client = stub
+    return client
+
+
+@pytest.mark.database
+def test_database_info():
+    """The requests made concurrently should be combined into one info dict, which is cached."""
+    stub = StubWeaviateClient()
+    client = _client_with(stub)
+
+    info = client.get_database_info()
+    assert info == {"ready": True, "schema_classes": ["XKCDComic"], "comic_count": 42, "version": "1.30.11"}
+    assert sorted(stub.calls) == ["get_meta", "is_ready", "list_all", "over_all"]
+
+    # Served from the cache, as a copy that callers can modify
+    info["schema_classes"].append("Other")
+    assert client.get_database_info()["schema_classes"] == ["XKCDComic"]
+    assert len(stub.calls) == 4
+
+    client.get_database_info(force=True)
+    assert len(stub.calls) == 8
+
+
+@pytest.mark.database
+def test_database_info_count_error():
+    """A failing comic count should leave the count at 0, rather than failing the whole request."""
+    client = _client_with(StubWeaviateClient(count_error=RuntimeError("aggregation failed")))
+
+    info = client.get_database_info()
+
+    assert info["ready"] and info["comic_count"] == 0
+
+
+@pytest.mark.database
+def test_comics_without_text_skipped(caplog):
+    """Comics without an explanation or transcript should be dropped quietly, with their IDs collected."""
+    comics = [
+        Comic(comic_id=1, title="Barrel", image_url=None, explanation="", transcript=""),
+        Comic(comic_id=2, title="Petit Trees", image_url=None, explanation="Explanation", transcript=""),
+        Comic(comic_id=3, title="Island", image_url=None, explanation="", transcript="Transcript"),
+    ]
+    skipped_ids = []
+
+    with caplog.at_level(logging.INFO):
+        imported = list(XKCDWeaviateClient._with_text_to_vectorize(comics, skipped_ids))
+
+    assert [comic.comic_id for comic in imported] == [2, 3]
+    assert skipped_ids == [1]
+    assert not caplog.records